@@ -0,0 +1,64 @@
+"""
+Micro-benchmark for the per-call overhead of ``inject_args``.
+
+Run from the project root::
+
+    python -m benchmarks.inject_args_bench
+"""
+import os
+import timeit
+import uuid
+from typing import Optional
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
+django.setup()
+
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+from dfv import inject_args, param, param_get  # noqa: E402
+
+NUMBER = 20_000
+
+
+def plain(_request, p1="", p2=0, p3=None, p4=None, p5=False, p6=None):
+    return HttpResponse()
+
+
+@inject_args()
+def injected(
+    _request,
+    p1: str = param(),
+    p2: int = param(),
+    p3: Optional[float] = param(),
+    p4: list[int] = param(),
+    p5: bool = param_get(),
+    p6: uuid.UUID = param(consume=False),
+):
+    return HttpResponse()
+
+
+def main():
+    rf = RequestFactory()
+    query = f"p1=a&p2=1&p3=1.5&p4=1&p4=2&p4=3&p5=true&p6={uuid.uuid4()}"
+    requests = [rf.get(f"/?{query}") for _ in range(NUMBER)]
+    for r in requests:
+        # force QueryDict parsing outside the measured section
+        _ = r.GET
+
+    it = iter(requests)
+    t_plain = timeit.timeit(lambda: plain(next(it)), number=NUMBER)
+    it = iter(requests)
+    t_injected = timeit.timeit(lambda: injected(next(it)), number=NUMBER)
+
+    per_call_plain = t_plain / NUMBER * 1e6
+    per_call_injected = t_injected / NUMBER * 1e6
+    print(f"plain call:        {per_call_plain:8.2f} us/call")
+    print(f"inject_args call:  {per_call_injected:8.2f} us/call")
+    print(f"overhead (6 args): {per_call_injected - per_call_plain:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark for the cost of view responses in a 3-level element tree like
+``main/views/elements.py``: a page view containing a level 2 element, which
+contains two level 3 elements.
+
+Run from the project root::
+
+    python -m benchmarks.view_response_bench
+"""
+import os
+import timeit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
+django.setup()
+
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+from dfv import element, view  # noqa: E402
+
+NUMBER = 20_000
+
+
+@view(handle_args=False)
+def level1_page(request):
+    return HttpResponse("<h1>Level 1</h1>" + str(level2_element(request)))
+
+
+@element(handle_args=False)
+def level2_element(request):
+    return HttpResponse(
+        "<h2>Level 2</h2>"
+        + str(level3a_element(request))
+        + str(level3b_element(request))
+    )
+
+
+@element(handle_args=False)
+def level3a_element(_request):
+    return HttpResponse("<h3>Level 3a</h3>")
+
+
+@element("l3b", tag="span", handle_args=False)
+def level3b_element(_request):
+    return HttpResponse("<h3>Level 3b</h3>")
+
+
+def access_attributes(response: HttpResponse):
+    _ = response.status_code
+    _ = response["Content-Type"]
+    _ = response.has_header("HX-Trigger")
+    _ = response.charset
+    _ = response.streaming
+
+
+def main():
+    request = RequestFactory().get("/")
+    # nested elements are returned to their parent, the leaves are the most
+    # frequently created responses
+    leaf = level3a_element(request)
+    root = level1_page(request)
+    plain = HttpResponse("<h3>Level 3a</h3>")
+
+    t_tree = timeit.timeit(lambda: level1_page(request), number=NUMBER)
+    t_leaf = timeit.timeit(lambda: level3a_element(request), number=NUMBER)
+    t_plain = timeit.timeit(lambda: HttpResponse("<h3>Level 3a</h3>"), number=NUMBER)
+    t_attr_leaf = timeit.timeit(lambda: access_attributes(leaf), number=NUMBER)
+    t_attr_root = timeit.timeit(lambda: access_attributes(root), number=NUMBER)
+    t_attr_plain = timeit.timeit(lambda: access_attributes(plain), number=NUMBER)
+    t_content = timeit.timeit(lambda: root.content, number=NUMBER)
+
+    def us(t: float) -> float:
+        return t / NUMBER * 1e6
+
+    print(f"render 3-level tree:        {us(t_tree):8.2f} us/tree")
+    print(f"render leaf element:        {us(t_leaf):8.2f} us/call")
+    print(f"construct plain response:   {us(t_plain):8.2f} us/call")
+    print(f"5 attributes, plain:        {us(t_attr_plain):8.2f} us")
+    print(f"5 attributes, leaf element: {us(t_attr_leaf):8.2f} us")
+    print(f"5 attributes, root view:    {us(t_attr_root):8.2f} us")
+    print(f"content, root view:         {us(t_content):8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 # ruff: noqa: F401
 
+from .cache import CachePolicy
+from .diff import DiffPolicy
 from .element import element, ElementResponse
 from .inject_args import (
     # handle_form,
@@ -8,6 +10,7 @@ from .inject_args import (
     param_get,
     param_post,
 )
+from .poll import PollPolicy
 from .view import view
 from .view_stack import (
     is_delete,
@@ -0,0 +1,124 @@
+import copy
+import functools
+import inspect
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.core.handlers.base import BaseHandler
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    QueryDict,
+)
+from django.urls import path, resolve, Resolver404, ResolverMatch
+from django.views.decorators.http import require_GET
+
+from dfv.htmx import to_swap_oob
+
+BATCH_PATH_NAME = "dfv-batch"
+
+# at most this many elements are rendered for one batch request
+MAX_BATCH_SIZE = 50
+
+
+def _resolve_element(url: str) -> Optional[tuple[ResolverMatch, str, str]]:
+    parts = urlsplit(url)
+    try:
+        match = resolve(parts.path)
+    except Resolver404:
+        return None
+    if not hasattr(match.func, "__dfv_element_id__"):
+        return None
+    return match, parts.path, parts.query
+
+
+def _element_request(
+    request: HttpRequest, match: ResolverMatch, path_info: str, query: str
+) -> HttpRequest:
+    element_request = copy.copy(request)
+    # every element gets its own view fn call stack, response handlers, etc.
+    for key in [k for k in element_request.__dict__ if k.startswith("__dfv_")]:
+        del element_request.__dict__[key]
+    element_request.path = element_request.path_info = path_info
+    element_request.META = {**request.META, "QUERY_STRING": query}
+    element_request.GET = QueryDict(query)
+    element_request.resolver_match = match
+    return element_request
+
+
+@functools.cache
+def _view_middleware() -> list[Callable]:
+    # the process_view() hooks of the MIDDLEWARE, e.g. for access control
+    handler = BaseHandler()
+    handler.load_middleware()
+    return handler._view_middleware  # noqa: SLF001
+
+
+@receiver(setting_changed)
+def _reset_view_middleware(*, setting: str, **_kwargs):
+    if setting == "MIDDLEWARE":
+        _view_middleware.cache_clear()
+
+
+def _render(request: HttpRequest, match: ResolverMatch) -> Any:
+    for process_view in _view_middleware():
+        response = process_view(request, match.func, match.args, match.kwargs)
+        if response is not None:
+            return response
+
+    response = match.func(request, *match.args, **match.kwargs)
+    if inspect.isawaitable(response):
+
+        async def wait():
+            return await response
+
+        response = async_to_sync(wait)()
+    return response
+
+
+@require_GET
+def batch_elements(request: HttpRequest) -> HttpResponse:
+    """
+    Renders several elements with a single request and returns them as
+    swap-oob fragments. Each `element` query parameter is the URL of an element,
+    including its query parameters:
+
+        /dfv/batch?element=/items/status%3Fitem%3D1&element=/cart/total
+
+    Every element is rendered through its view as if it were requested with its
+    URL. The process_view() hooks of the middleware run for every element, the
+    other middleware hooks only run once for the batch request. Only views
+    decorated with element() are rendered. Responses other than 200 OK, e.g. 204 No Content of an
+    unchanged polled element, are left out, and headers of the element
+    responses are discarded.
+    """
+    urls = request.GET.getlist("element")
+    if len(urls) > MAX_BATCH_SIZE:
+        return HttpResponseBadRequest("Too many elements.")
+
+    resolved = [_resolve_element(url) for url in urls]
+    if any(r is None for r in resolved):
+        return HttpResponseBadRequest("Unknown element.")
+
+    fragments: list[bytes] = []
+    for match, path_info, query in [r for r in resolved if r is not None]:
+        element_request = _element_request(request, match, path_info, query)
+        response = _render(element_request, match)
+        if isinstance(response, HttpResponse) and response.status_code == 200:
+            fragments += to_swap_oob(response)
+
+    return HttpResponse(b"".join(fragments))
+
+
+def create_batch_path(route="dfv/batch"):
+    """
+    Returns the URL pattern of the batch endpoint, which dfvRefresh() of dfv.js
+    uses:
+
+        urlpatterns = [create_batch_path(), ...]
+    """
+    return path(route, batch_elements, name=BATCH_PATH_NAME)
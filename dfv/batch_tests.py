@@ -0,0 +1,105 @@
+from urllib.parse import urlencode
+
+import pytest
+from django.http import HttpResponse, HttpResponseForbidden
+from django.test import RequestFactory
+
+from dfv import element, param
+from dfv.batch import batch_elements, create_batch_path, MAX_BATCH_SIZE
+from dfv.response_handler import hook_swap_oob
+from dfv.route import create_path
+
+
+@element()
+def status(request, item: int = param()):
+    return HttpResponse(f"{request.path} item {item}")
+
+
+@element("cart-total", tag="span")
+def total(request):
+    hook_swap_oob(request, HttpResponse("<p id='count'>3</p>"))
+    return HttpResponse("total")
+
+
+@element()
+def unchanged(_request):
+    return HttpResponse(status=204)
+
+
+class DenyTotalMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, _request, view_func, _view_args, _view_kwargs):
+        if view_func is total:
+            return HttpResponseForbidden()
+        return None
+
+
+def plain_view(_request):
+    return HttpResponse("plain")
+
+
+urlpatterns = [
+    create_batch_path(),
+    create_path(status),
+    create_path(total),
+    create_path(unchanged),
+    create_path(plain_view),
+]
+
+
+def _batch_request(rf: RequestFactory, *urls: str):
+    return rf.get("/dfv/batch?" + urlencode([("element", u) for u in urls]))
+
+
+@pytest.mark.urls(__name__)
+def test_batch_elements(rf: RequestFactory):
+    request = _batch_request(rf, "/status?item=1", "/total", "/status?item=2")
+    response = batch_elements(request)
+    assert response.status_code == 200
+    assert response.content == (
+        b'<div id="status" hx-target="this" hx-swap="outerHTML" '
+        b'hx-swap-oob="outerHTML:#status">/status item 1</div>'
+        b'<span id="cart-total" hx-target="this" hx-swap="outerHTML" '
+        b'hx-swap-oob="outerHTML:#cart-total">total</span>'
+        b'<p id="count" hx-swap-oob="outerHTML:#count">3</p>'
+        b'<div id="status" hx-target="this" hx-swap="outerHTML" '
+        b'hx-swap-oob="outerHTML:#status">/status item 2</div>'
+    )
+    # the batch request itself is not changed
+    assert request.path == "/dfv/batch"
+
+
+@pytest.mark.urls(__name__)
+def test_batch_skips_responses_without_content(rf: RequestFactory):
+    response = batch_elements(_batch_request(rf, "/unchanged", "/total"))
+    assert response.content.startswith(b'<span id="cart-total"')
+
+
+@pytest.mark.urls(__name__)
+def test_batch_only_renders_elements(rf: RequestFactory):
+    assert batch_elements(_batch_request(rf, "/plain_view")).status_code == 400
+    assert batch_elements(_batch_request(rf, "/missing")).status_code == 400
+
+
+@pytest.mark.urls(__name__)
+def test_batch_size_is_limited(rf: RequestFactory):
+    urls = ["/total"] * (MAX_BATCH_SIZE + 1)
+    assert batch_elements(_batch_request(rf, *urls)).status_code == 400
+
+
+@pytest.mark.urls(__name__)
+def test_batch_requires_get(rf: RequestFactory):
+    assert batch_elements(rf.post("/dfv/batch")).status_code == 405
+
+
+@pytest.mark.urls(__name__)
+def test_batch_runs_process_view_of_middleware(rf: RequestFactory, settings):
+    settings.MIDDLEWARE = [f"{__name__}.DenyTotalMiddleware"]
+    response = batch_elements(_batch_request(rf, "/total", "/status?item=1"))
+    assert response.content.startswith(b'<div id="status"')
+    assert b"total" not in response.content
@@ -0,0 +1,418 @@
+import contextlib
+import functools
+import hashlib
+import inspect
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, cast, Iterable, Iterator, Literal, Optional, Sequence
+
+from asgiref.sync import sync_to_async
+
+from django.core.cache import caches, DEFAULT_CACHE_ALIAS
+from django.core.cache.backends.base import BaseCache
+from django.db import models
+from django.db.models.signals import post_delete, post_init, post_save
+from django.http import HttpRequest, HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import cc_delim_re
+
+from dfv.utils import _get_request_from_args
+
+# (status code, headers, content, versions of the model instances it depends on)
+CACHED_RESPONSE = tuple[int, list[tuple[str, str]], bytes, dict[str, str]]
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Caches the rendered output of a view or element for GET and HEAD requests.
+
+    The cache key contains the view fn, the values of the view fn parameters
+    named in `params` (all parameters except the request if None) and the
+    attributes of `request.user` named in `user_attrs`. Model instances are
+    identified by their primary key. A response with a Vary header, e.g. from
+    render_page(), is stored per value of the request headers it names.
+    Responses with `Vary: *` are not stored.
+
+    With `track_instances=True`, a cache entry is invalidated when a model
+    instance passed to the view fn, e.g. injected with a model-typed param(), is
+    saved or deleted. With `track_instances="all"`, this also applies to every
+    model instance loaded while the view fn and its template render.
+
+    A cache hit returns the stored response without calling the view fn. Only
+    successful responses without cookies are stored, and not if they use the
+    CSRF token, e.g. with {% csrf_token %}. Views that register response
+    handlers, e.g. with hook_swap_oob(), should not be cached, since the
+    handlers are not registered on a cache hit.
+    """
+
+    timeout: Optional[float] = 300
+    params: Optional[Sequence[str]] = None
+    user_attrs: Sequence[str] = ()
+    cache_alias: str = DEFAULT_CACHE_ALIAS
+    track_instances: bool | Literal["all"] = False
+
+    def get_cache(self) -> BaseCache:
+        return caches[self.cache_alias]
+
+
+def _key_value(value: Any) -> str:
+    if isinstance(value, models.Model):
+        return f"{value._meta.label}:{value.pk!r}"  # noqa: SLF001
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_key_value(v) for v in value) + "]"
+    return repr(value)
+
+
+def _create_key_builder(
+    fn: Callable, policy: CachePolicy
+) -> Callable[[HttpRequest, dict[str, Any]], str]:
+    names = (
+        list(inspect.signature(fn).parameters)[1:]
+        if policy.params is None
+        else policy.params
+    )
+    fn_name = f"{fn.__module__}.{fn.__qualname__}"
+
+    def build_key(request: HttpRequest, arguments: dict[str, Any]) -> str:
+        parts = [f"{name}={_key_value(arguments[name])}" for name in names]
+        user = getattr(request, "user", None)
+        parts += [
+            f"user.{a}={_key_value(getattr(user, a, None))}" for a in policy.user_attrs
+        ]
+        digest = hashlib.md5(
+            "\n".join(parts).encode("UTF-8"), usedforsecurity=False
+        ).hexdigest()
+        return f"dfv.cache:{fn_name}:{digest}"
+
+    return build_key
+
+
+########################################################################
+# dependency tracking
+########################################################################
+
+
+# Every model instance has a version token in the cache. Cache entries store
+# the tokens of the instances they depend on, and saving or deleting an
+# instance deletes its token, which invalidates all these entries.
+
+_tracking_cache_aliases: set[str] = set()
+
+_loaded_instances: ContextVar[Optional[set[str]]] = ContextVar(
+    "dfv_cache_loaded_instances", default=None
+)
+
+
+def _dependency_key(instance: models.Model) -> Optional[str]:
+    if instance.pk is None:
+        return None
+    meta = instance._meta.concrete_model._meta  # noqa: SLF001
+    return f"dfv.cache.dep:{meta.label}:{instance.pk!r}"
+
+
+def _invalidate_instance(sender, instance: models.Model, **kwargs):
+    key = _dependency_key(instance)
+    if key is not None:
+        for alias in list(_tracking_cache_aliases):
+            caches[alias].delete(key)
+
+
+def _record_loaded_instance(sender, instance: models.Model, **kwargs):
+    loaded = _loaded_instances.get()
+    key = _dependency_key(instance) if loaded is not None else None
+    if key is not None:
+        cast(set, loaded).add(key)
+
+
+def _enable_tracking(policy: CachePolicy):
+    _tracking_cache_aliases.add(policy.cache_alias)
+    post_save.connect(_invalidate_instance, dispatch_uid="dfv.cache.post_save")
+    post_delete.connect(_invalidate_instance, dispatch_uid="dfv.cache.post_delete")
+    if policy.track_instances == "all":
+        post_init.connect(_record_loaded_instance, dispatch_uid="dfv.cache.post_init")
+
+
+def _record_dependencies(keys: Iterable[str]):
+    # an enclosing view that tracks all loaded instances also depends on the
+    # instances of nested views, even if those are cache hits
+    loaded = _loaded_instances.get()
+    if loaded is not None:
+        loaded.update(keys)
+
+
+@contextlib.contextmanager
+def _track_loaded_instances() -> Iterator[set[str]]:
+    loaded: set[str] = set()
+    token = _loaded_instances.set(loaded)
+    try:
+        yield loaded
+    finally:
+        _loaded_instances.reset(token)
+        _record_dependencies(loaded)
+
+
+def _argument_dependencies(arguments: dict[str, Any]) -> set[str]:
+    keys = set()
+    for value in arguments.values():
+        for v in value if isinstance(value, (list, tuple)) else [value]:
+            key = _dependency_key(v) if isinstance(v, models.Model) else None
+            if key is not None:
+                keys.add(key)
+    return keys
+
+
+def _get_versions(cache: BaseCache, keys: Iterable[str]) -> dict[str, str]:
+    keys = set(keys)
+    if not keys:
+        return {}
+
+    versions = cache.get_many(keys)
+    for key in keys - versions.keys():
+        # add() keeps a token that was set concurrently
+        cache.add(key, uuid.uuid4().hex, None)
+        versions[key] = cache.get(key)
+    return versions
+
+
+async def _aget_versions(cache: BaseCache, keys: Iterable[str]) -> dict[str, str]:
+    keys = set(keys)
+    if not keys:
+        return {}
+
+    versions = await cache.aget_many(keys)
+    for key in keys - versions.keys():
+        await cache.aadd(key, uuid.uuid4().hex, None)
+        versions[key] = await cache.aget(key)
+    return versions
+
+
+def _is_valid(versions: dict[str, str], current: dict[str, str]) -> bool:
+    return all(k in current and current[k] == v for k, v in versions.items())
+
+
+########################################################################
+# caching
+########################################################################
+
+
+# get_token() sets it, e.g. for {% csrf_token %}
+_CSRF_TOKEN_USED = "CSRF_COOKIE_NEEDS_UPDATE"
+
+
+@contextlib.contextmanager
+def _track_csrf_token_use(request: HttpRequest) -> Iterator[list[bool]]:
+    """
+    Yields a list that contains True after the block if the block used the
+    request's CSRF token. A response with the token must not be shared.
+    """
+    used_before = request.META.pop(_CSRF_TOKEN_USED, False)
+    used: list[bool] = []
+    try:
+        yield used
+    finally:
+        if request.META.get(_CSRF_TOKEN_USED):
+            used.append(True)
+        elif used_before:
+            request.META[_CSRF_TOKEN_USED] = used_before
+
+
+def _is_cacheable_request(request: HttpRequest) -> bool:
+    return request.method in ("GET", "HEAD")
+
+
+def _is_cacheable_response(response: Any) -> bool:
+    return (
+        isinstance(response, HttpResponse)
+        and response.status_code == 200
+        and not response.cookies
+    )
+
+
+def _restore(cached: CACHED_RESPONSE) -> HttpResponse:
+    status, headers, content, versions = cached
+    _record_dependencies(versions)
+    response = HttpResponse(content, status=status, headers=dict(headers))
+    setattr(response, "_dfv_cache_hit", True)
+    return response
+
+
+def _to_cached(response: HttpResponse, versions: dict[str, str]) -> CACHED_RESPONSE:
+    return response.status_code, list(response.items()), response.content, versions
+
+
+# A response that varies on request headers, e.g. render_page() on HX-Request,
+# is stored under a key that contains the values of these headers. The header
+# names are stored under the key of the view fn call.
+
+
+def _vary_key(key: str) -> str:
+    return f"{key}:vary"
+
+
+def _response_key(key: str, request: HttpRequest, headers: Sequence[str]) -> str:
+    if not headers:
+        return key
+    values = "\n".join(f"{h}={request.headers.get(h)!r}" for h in headers)
+    digest = hashlib.md5(values.encode("UTF-8"), usedforsecurity=False).hexdigest()
+    return f"{key}:{digest}"
+
+
+def _vary_headers(response: HttpResponse) -> Optional[list[str]]:
+    if not response.has_header("Vary"):
+        return []
+    headers = {h.strip().lower() for h in cc_delim_re.split(response["Vary"])}
+    headers.discard("")
+    # Vary: * can not be keyed
+    return None if "*" in headers else sorted(headers)
+
+
+def is_cache_hit(response: Any) -> bool:
+    return getattr(response, "_dfv_cache_hit", False)
+
+
+def cache_view_fn(fn: Callable, policy: CachePolicy) -> Callable:
+    """
+    Wraps a view fn with a cache lookup. On a cache miss, the view fn's response
+    is marked to be stored. The view or element decorator stores it with
+    store_cached_response() once the response is complete, e.g. wrapped with
+    the element's tag.
+    """
+    signature = inspect.signature(fn)
+    build_key = _create_key_builder(fn, policy)
+    track_all = policy.track_instances == "all"
+    if policy.track_instances:
+        _enable_tracking(policy)
+
+    def bind_arguments(args, kwargs) -> dict[str, Any]:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return bound.arguments
+
+    def mark_for_store(
+        response, request, key: str, versions: dict[str, str], csrf: list[bool]
+    ):
+        if _is_cacheable_response(response) and not csrf:
+            setattr(response, "_dfv_cache_store", (policy, key, versions, request))
+        return response
+
+    @functools.wraps(fn)
+    def inner(*args, **kwargs):
+        request = _get_request_from_args(cast(Any, args))
+        if not _is_cacheable_request(request):
+            return fn(*args, **kwargs)
+
+        cache = policy.get_cache()
+        arguments = bind_arguments(args, kwargs)
+        key = build_key(request, arguments)
+        headers = cache.get(_vary_key(key))
+        cached = (
+            cache.get(_response_key(key, request, headers))
+            if headers is not None
+            else None
+        )
+        if cached is not None and (
+            not cached[3] or _is_valid(cached[3], cache.get_many(cached[3]))
+        ):
+            return _restore(cached)
+
+        # the versions are read before rendering, so that saves during the
+        # rendering invalidate the entry
+        dependencies = (
+            _argument_dependencies(arguments) if policy.track_instances else set()
+        )
+        versions = _get_versions(cache, dependencies)
+        # the template is rendered here to see whether it uses the CSRF token
+        with _track_csrf_token_use(request) as csrf:
+            if track_all:
+                with _track_loaded_instances() as loaded:
+                    response = fn(*args, **kwargs)
+                    if isinstance(response, SimpleTemplateResponse):
+                        response.render()
+                versions.update(_get_versions(cache, loaded - versions.keys()))
+            else:
+                _record_dependencies(versions)
+                response = fn(*args, **kwargs)
+                if isinstance(response, SimpleTemplateResponse):
+                    response.render()
+        return mark_for_store(response, request, key, versions, csrf)
+
+    @functools.wraps(fn)
+    async def async_inner(*args, **kwargs):
+        request = _get_request_from_args(cast(Any, args))
+        if not _is_cacheable_request(request):
+            return await fn(*args, **kwargs)
+
+        cache = policy.get_cache()
+        arguments = bind_arguments(args, kwargs)
+        key = build_key(request, arguments)
+        headers = await cache.aget(_vary_key(key))
+        cached = (
+            await cache.aget(_response_key(key, request, headers))
+            if headers is not None
+            else None
+        )
+        if cached is not None and (
+            not cached[3] or _is_valid(cached[3], await cache.aget_many(cached[3]))
+        ):
+            return _restore(cached)
+
+        dependencies = (
+            _argument_dependencies(arguments) if policy.track_instances else set()
+        )
+        versions = await _aget_versions(cache, dependencies)
+        with _track_csrf_token_use(request) as csrf:
+            if track_all:
+                with _track_loaded_instances() as loaded:
+                    response = await fn(*args, **kwargs)
+                    if isinstance(response, SimpleTemplateResponse):
+                        await sync_to_async(response.render)()
+                versions.update(await _aget_versions(cache, loaded - versions.keys()))
+            else:
+                _record_dependencies(versions)
+                response = await fn(*args, **kwargs)
+                if isinstance(response, SimpleTemplateResponse):
+                    await sync_to_async(response.render)()
+        return mark_for_store(response, request, key, versions, csrf)
+
+    return async_inner if inspect.iscoroutinefunction(fn) else inner
+
+
+def _pop_store(
+    response: Any,
+) -> Optional[tuple[CachePolicy, dict[str, Any]]]:
+    if not isinstance(response, HttpResponse):
+        return None
+    store = response.__dict__.pop("_dfv_cache_store", None)
+    if store is None or not _is_cacheable_response(response):
+        return None
+
+    policy, key, versions, request = store
+    headers = _vary_headers(response)
+    if headers is None:
+        return None
+    return policy, {
+        _vary_key(key): headers,
+        _response_key(key, request, headers): _to_cached(response, versions),
+    }
+
+
+def store_cached_response(response: Any) -> Any:
+    """
+    Stores a response that cache_view_fn() marked. Call it after all headers,
+    in particular Vary, are set.
+    """
+    store = _pop_store(response)
+    if store is not None:
+        policy, entries = store
+        policy.get_cache().set_many(entries, policy.timeout)
+    return response
+
+
+async def astore_cached_response(response: Any) -> Any:
+    store = _pop_store(response)
+    if store is not None:
+        policy, entries = store
+        await policy.get_cache().aset_many(entries, policy.timeout)
+    return response
@@ -0,0 +1,351 @@
+import contextlib
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import sys
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from django.core.exceptions import ImproperlyConfigured
+
+if sys.platform.startswith("linux"):
+    import fcntl
+
+# magic, slot size, ways, number of sets
+_FILE_HEADER = struct.Struct("<8sQQQ")
+_MAGIC = b"DFVSHM01"
+# key hash, last access (monotonic ns), expiry (0 = never), key length,
+# value length
+_SLOT_HEADER = struct.Struct("<QqdII")
+_LOCK_STRIPES = 64
+
+
+class _MappedFile:
+    """
+    The memory mapping of a cache file, shared by all cache instances of a
+    process. Django creates a cache instance per thread, so the thread locks
+    must be shared as well.
+    """
+
+    def __init__(self, path: str, size: int, header: bytes):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(fd, fcntl.LOCK_EX)
+        try:
+            file_header = os.pread(fd, len(header), 0)
+            if not file_header.strip(b"\0"):
+                # new file, no process maps it before its header is written
+                os.ftruncate(fd, size)
+                os.pwrite(fd, header, 0)
+            elif file_header != header or os.fstat(fd).st_size != size:
+                # other processes may still map the file, it must not change
+                raise _different_layout(path)
+        except BaseException:
+            # also releases the lock
+            os.close(fd)
+            raise
+        fcntl.lockf(fd, fcntl.LOCK_UN)
+
+        self.fd = fd
+        self.header = header
+        self.mmap = mmap.mmap(fd, size)
+        self.thread_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+
+
+def _different_layout(path: str) -> ImproperlyConfigured:
+    return ImproperlyConfigured(
+        f"The SharedMemoryCache file '{path}' has a different layout. Use another "
+        "LOCATION or delete the file when no process uses it."
+    )
+
+
+_mapped_files: dict[tuple[int, str], _MappedFile] = {}
+_mapped_files_lock = threading.Lock()
+
+
+def _get_mapped_file(path: str, size: int, header: bytes) -> _MappedFile:
+    # a forked worker opens its own file descriptor, so that its byte-range
+    # locks are its own and no thread lock of the parent is inherited
+    key = (os.getpid(), path)
+    mapped_file = _mapped_files.get(key)
+    if mapped_file is None:
+        with _mapped_files_lock:
+            mapped_file = _mapped_files.get(key)
+            if mapped_file is None:
+                mapped_file = _MappedFile(path, size, header)
+                _mapped_files[key] = mapped_file
+    if mapped_file.header != header:
+        raise _different_layout(path)
+    return mapped_file
+
+
+class SharedMemoryCache(BaseCache):
+    """
+    A cache backend that stores values in a memory-mapped file, which is shared
+    by all processes on the host, e.g. all gunicorn workers. It needs no outside
+    service and only runs on Linux:
+
+        CACHES = {
+            "dfv": {
+                "BACKEND": "dfv.cache_backends.SharedMemoryCache",
+                "LOCATION": "/dev/shm/dfv-cache",
+                "OPTIONS": {"MAX_SIZE": 64 * 1024 * 1024},
+            },
+        }
+
+    The file is a set-associative table: a key maps to a set of `WAYS` slots of
+    `SLOT_SIZE` bytes each. When a set is full, its least recently used entry
+    is evicted. The file never grows beyond `MAX_SIZE` bytes. Values that do
+    not fit into a slot are not stored. The file keeps its layout, so a change
+    of SLOT_SIZE, WAYS or MAX_SIZE needs another LOCATION.
+
+    Each set is locked with a byte-range lock on the file across processes and
+    with a thread lock within a process.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location: str, params: dict):
+        super().__init__(params)
+        if not sys.platform.startswith("linux"):
+            raise ImproperlyConfigured("SharedMemoryCache is only available on Linux.")
+
+        options = params.get("OPTIONS", {})
+        self._path = location
+        self._slot_size = int(options.get("SLOT_SIZE", 16 * 1024))
+        self._ways = int(options.get("WAYS", 8))
+        max_size = int(options.get("MAX_SIZE", 64 * 1024 * 1024))
+        self._num_sets = (max_size - _FILE_HEADER.size) // (
+            self._slot_size * self._ways
+        )
+        if self._slot_size <= _SLOT_HEADER.size or self._num_sets < 1:
+            raise ImproperlyConfigured(
+                "MAX_SIZE of SharedMemoryCache must hold at least WAYS slots of SLOT_SIZE bytes."
+            )
+
+        self._size = _FILE_HEADER.size + self._num_sets * self._ways * self._slot_size
+        self._header = _FILE_HEADER.pack(
+            _MAGIC, self._slot_size, self._ways, self._num_sets
+        )
+
+    def _set_offset(self, set_index: int) -> int:
+        return _FILE_HEADER.size + set_index * self._ways * self._slot_size
+
+    @contextlib.contextmanager
+    def _lock_set(self, set_index: int) -> Iterator[mmap.mmap]:
+        mapped_file = _get_mapped_file(self._path, self._size, self._header)
+        length = self._ways * self._slot_size
+        offset = self._set_offset(set_index)
+        with mapped_file.thread_locks[set_index % _LOCK_STRIPES]:
+            fcntl.lockf(mapped_file.fd, fcntl.LOCK_EX, length, offset)
+            try:
+                yield mapped_file.mmap
+            finally:
+                fcntl.lockf(mapped_file.fd, fcntl.LOCK_UN, length, offset)
+
+    ####################################################################
+    # slots
+    ####################################################################
+
+    def _hash(self, key: str) -> tuple[int, int, bytes]:
+        key_bytes = key.encode("UTF-8")
+        digest = hashlib.blake2b(key_bytes, digest_size=8).digest()
+        key_hash = int.from_bytes(digest, "little")
+        return key_hash, key_hash % self._num_sets, key_bytes
+
+    def _slot_offsets(self, set_index: int) -> range:
+        offset = self._set_offset(set_index)
+        return range(offset, offset + self._ways * self._slot_size, self._slot_size)
+
+    def _find(
+        self, mm: mmap.mmap, set_index: int, key_hash: int, key_bytes: bytes
+    ) -> Optional[int]:
+        for offset in self._slot_offsets(set_index):
+            slot_hash, _, _, key_len, _ = _SLOT_HEADER.unpack_from(mm, offset)
+            start = offset + _SLOT_HEADER.size
+            if (
+                slot_hash == key_hash
+                and key_len == len(key_bytes)
+                and mm[start : start + key_len] == key_bytes
+            ):
+                return offset
+        return None
+
+    def _find_live(
+        self, mm: mmap.mmap, set_index: int, key_hash: int, key_bytes: bytes
+    ) -> Optional[int]:
+        offset = self._find(mm, set_index, key_hash, key_bytes)
+        if offset is None:
+            return None
+
+        expires = _SLOT_HEADER.unpack_from(mm, offset)[2]
+        if expires and expires <= time.time():
+            self._clear_slot(mm, offset)
+            return None
+        return offset
+
+    def _find_free(self, mm: mmap.mmap, set_index: int) -> int:
+        now = time.time()
+        lru_offset, lru_access = -1, None
+        for offset in self._slot_offsets(set_index):
+            _, last_access, expires, key_len, _ = _SLOT_HEADER.unpack_from(mm, offset)
+            if key_len == 0 or (expires and expires <= now):
+                return offset
+            if lru_access is None or last_access < lru_access:
+                lru_offset, lru_access = offset, last_access
+        return lru_offset
+
+    def _clear_slot(self, mm: mmap.mmap, offset: int):
+        _SLOT_HEADER.pack_into(mm, offset, 0, 0, 0.0, 0, 0)
+
+    def _touch_slot(self, mm: mmap.mmap, offset: int, expires: Optional[float] = None):
+        key_hash, _, old_expires, key_len, value_len = _SLOT_HEADER.unpack_from(
+            mm, offset
+        )
+        _SLOT_HEADER.pack_into(
+            mm,
+            offset,
+            key_hash,
+            time.monotonic_ns(),
+            old_expires if expires is None else expires,
+            key_len,
+            value_len,
+        )
+
+    def _write_slot(
+        self,
+        mm: mmap.mmap,
+        offset: int,
+        key_hash: int,
+        key_bytes: bytes,
+        pickled: bytes,
+        expires: float,
+    ):
+        # a process killed while writing leaves an empty slot
+        self._clear_slot(mm, offset)
+        start = offset + _SLOT_HEADER.size
+        mm[start : start + len(key_bytes)] = key_bytes
+        start += len(key_bytes)
+        mm[start : start + len(pickled)] = pickled
+        _SLOT_HEADER.pack_into(
+            mm,
+            offset,
+            key_hash,
+            time.monotonic_ns(),
+            expires,
+            len(key_bytes),
+            len(pickled),
+        )
+
+    def _read_value(self, mm: mmap.mmap, offset: int) -> bytes:
+        _, _, _, key_len, value_len = _SLOT_HEADER.unpack_from(mm, offset)
+        start = offset + _SLOT_HEADER.size + key_len
+        return mm[start : start + value_len]
+
+    def _fits(self, key_bytes: bytes, pickled: bytes) -> bool:
+        return _SLOT_HEADER.size + len(key_bytes) + len(pickled) <= self._slot_size
+
+    def _expires(self, timeout: Any) -> float:
+        expires = self.get_backend_timeout(timeout)
+        return 0.0 if expires is None else expires
+
+    def _store(self, key: str, value: Any, timeout: Any, only_if_missing: bool) -> bool:
+        key_hash, set_index, key_bytes = self._hash(key)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        expires = self._expires(timeout)
+        with self._lock_set(set_index) as mm:
+            offset = self._find_live(mm, set_index, key_hash, key_bytes)
+            if offset is not None and only_if_missing:
+                return False
+            if not self._fits(key_bytes, pickled):
+                # do not keep an outdated value
+                if offset is not None:
+                    self._clear_slot(mm, offset)
+                return False
+            if offset is None:
+                offset = self._find_free(mm, set_index)
+            self._write_slot(mm, offset, key_hash, key_bytes, pickled, expires)
+            return True
+
+    ####################################################################
+    # cache API
+    ####################################################################
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._store(key, value, timeout, only_if_missing=True)
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        key_hash, set_index, key_bytes = self._hash(key)
+        with self._lock_set(set_index) as mm:
+            offset = self._find_live(mm, set_index, key_hash, key_bytes)
+            if offset is None:
+                return default
+            self._touch_slot(mm, offset)
+            pickled = self._read_value(mm, offset)
+        try:
+            return pickle.loads(pickled)
+        except Exception:
+            # e.g. a value of a class that no longer exists
+            return default
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._store(key, value, timeout, only_if_missing=False)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        key_hash, set_index, key_bytes = self._hash(key)
+        with self._lock_set(set_index) as mm:
+            offset = self._find_live(mm, set_index, key_hash, key_bytes)
+            if offset is None:
+                return False
+            self._touch_slot(mm, offset, self._expires(timeout))
+            return True
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        key_hash, set_index, key_bytes = self._hash(key)
+        with self._lock_set(set_index) as mm:
+            offset = self._find_live(mm, set_index, key_hash, key_bytes)
+            if offset is None:
+                return False
+            self._clear_slot(mm, offset)
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        key_hash, set_index, key_bytes = self._hash(key)
+        with self._lock_set(set_index) as mm:
+            offset = self._find_live(mm, set_index, key_hash, key_bytes)
+            if offset is None:
+                raise ValueError("Key '%s' not found" % key)
+            try:
+                value = pickle.loads(self._read_value(mm, offset))
+            except Exception:
+                self._clear_slot(mm, offset)
+                raise ValueError("Key '%s' not found" % key)
+            value += delta
+            pickled = pickle.dumps(value, self.pickle_protocol)
+            if not self._fits(key_bytes, pickled):
+                self._clear_slot(mm, offset)
+                raise ValueError("Key '%s' does not fit into a slot" % key)
+            expires = _SLOT_HEADER.unpack_from(mm, offset)[2]
+            self._write_slot(mm, offset, key_hash, key_bytes, pickled, expires)
+        return value
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        key_hash, set_index, key_bytes = self._hash(key)
+        with self._lock_set(set_index) as mm:
+            return self._find_live(mm, set_index, key_hash, key_bytes) is not None
+
+    def clear(self):
+        for set_index in range(self._num_sets):
+            with self._lock_set(set_index) as mm:
+                for offset in self._slot_offsets(set_index):
+                    self._clear_slot(mm, offset)
@@ -0,0 +1,173 @@
+import multiprocessing
+import pickle
+import threading
+import time
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.test import override_settings, RequestFactory
+
+from dfv import CachePolicy, element
+from dfv.cache_backends import SharedMemoryCache
+
+SLOT_SIZE = 256
+
+
+def _create_cache(path, sets=1, ways=2, **options) -> SharedMemoryCache:
+    return SharedMemoryCache(
+        str(path),
+        {
+            "OPTIONS": {
+                "SLOT_SIZE": SLOT_SIZE,
+                "WAYS": ways,
+                "MAX_SIZE": 64 + sets * ways * SLOT_SIZE,
+                **options,
+            }
+        },
+    )
+
+
+def test_set_get_delete(tmp_path):
+    cache = _create_cache(tmp_path / "cache")
+    assert cache.get("a") is None
+    cache.set("a", b"value")
+    assert cache.get("a") == b"value"
+    assert cache.has_key("a")
+    assert not cache.add("a", b"other")
+    assert cache.delete("a")
+    assert cache.get("a", "default") == "default"
+    assert cache.add("a", b"other")
+    assert cache.get("a") == b"other"
+
+
+def test_expiry(tmp_path):
+    cache = _create_cache(tmp_path / "cache")
+    cache.set("a", 1, timeout=0.05)
+    cache.set("b", 2, timeout=None)
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_lru_eviction_and_size_cap(tmp_path):
+    cache = _create_cache(tmp_path / "cache", sets=1, ways=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert (tmp_path / "cache").stat().st_size <= 64 + 2 * SLOT_SIZE
+
+
+def test_value_too_large_is_not_stored(tmp_path):
+    cache = _create_cache(tmp_path / "cache")
+    cache.set("a", b"small")
+    cache.set("a", b"x" * SLOT_SIZE)
+    assert cache.get("a") is None
+
+
+def test_incr_and_clear(tmp_path):
+    cache = _create_cache(tmp_path / "cache")
+    cache.set("a", 1)
+    assert cache.incr("a", 2) == 3
+    assert cache.get("a") == 3
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_file_with_different_layout_is_not_changed(tmp_path):
+    cache = _create_cache(tmp_path / "cache")
+    cache.set("a", 1)
+    with pytest.raises(ImproperlyConfigured):
+        _create_cache(tmp_path / "cache", ways=4).get("a")
+    assert cache.get("a") == 1
+
+    other = tmp_path / "other"
+    other.write_bytes(b"not a cache file")
+    with pytest.raises(ImproperlyConfigured):
+        _create_cache(other).get("a")
+    assert other.read_bytes() == b"not a cache file"
+
+
+def test_value_that_can_not_be_unpickled_is_a_miss(tmp_path):
+    cache = _create_cache(tmp_path / "cache")
+    cache.set("a", 1)
+    cache.set("b", 2)
+    pickled = pickle.dumps(1, SharedMemoryCache.pickle_protocol)
+    # damage the pickle, the file is mapped shared
+    with open(tmp_path / "cache", "r+b") as f:
+        f.seek(f.read().index(pickled))
+        f.write(b"\0" * len(pickled))
+
+    assert cache.get("a", "default") == "default"
+    with pytest.raises(ValueError):
+        cache.incr("a")
+    assert not cache.has_key("a")
+    assert cache.get("b") == 2
+
+
+def _increment_in_process(path, count):
+    cache = _create_cache(path, sets=4)
+    for _ in range(count):
+        cache.incr("counter")
+
+
+def test_shared_between_processes(tmp_path):
+    path = tmp_path / "cache"
+    cache = _create_cache(path, sets=4)
+    cache.set("counter", 0)
+
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_increment_in_process, args=(path, 200))
+        for _ in range(4)
+    ]
+    threads = [
+        threading.Thread(target=_increment_in_process, args=(path, 200))
+        for _ in range(2)
+    ]
+    for p in processes:
+        p.start()
+    for t in threads:
+        t.start()
+    for p in processes:
+        p.join()
+    for t in threads:
+        t.join()
+
+    assert cache.get("counter") == 6 * 200
+
+
+def test_cache_policy_with_shared_memory_cache(tmp_path, rf: RequestFactory):
+    calls = []
+    caches_setting = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "shm": {
+            "BACKEND": "dfv.cache_backends.SharedMemoryCache",
+            "LOCATION": str(tmp_path / "cache"),
+            "OPTIONS": {"MAX_SIZE": 1024 * 1024},
+        },
+    }
+
+    with override_settings(CACHES=caches_setting):
+
+        @element(cache=CachePolicy(cache_alias="shm"))
+        def viewfn(_request):
+            calls.append(1)
+            return HttpResponse("body")
+
+        first = viewfn(rf.get("/"))
+        second = viewfn(rf.get("/"))
+
+    assert len(calls) == 1
+    assert second.content == first.content
+
+
+@pytest.mark.parametrize("max_size", [0, 64])
+def test_invalid_size(tmp_path, max_size):
+    with pytest.raises(Exception):
+        _create_cache(tmp_path / "cache", MAX_SIZE=max_size)
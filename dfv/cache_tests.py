@@ -0,0 +1,285 @@
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template.response import TemplateResponse
+from django.test import RequestFactory
+
+from dfv import element, param, view
+from dfv.cache import CachePolicy
+from dfv.template_block import render_page
+from dfv.utils import response_to_str
+from main.models import AppUser
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    caches["default"].clear()
+
+
+def test_element_cache_hit_skips_view_fn(rf: RequestFactory):
+    calls = []
+
+    @element(cache=CachePolicy(timeout=60))
+    def viewfn(_request, p1: str = param()):
+        calls.append(p1)
+        return HttpResponse(f"body {p1}")
+
+    first = viewfn(rf.get("/?p1=a"))
+    second = viewfn(rf.get("/?p1=a"))
+    assert calls == ["a"]
+    assert second.content == first.content
+    assert second.content.startswith(b"<div id='viewfn'")
+
+    viewfn(rf.get("/?p1=b"))
+    assert calls == ["a", "b"]
+
+
+def test_cache_only_get_requests(rf: RequestFactory):
+    calls = []
+
+    @element(cache=CachePolicy())
+    def viewfn(_request):
+        calls.append(1)
+        return HttpResponse("body")
+
+    viewfn(rf.post("/"))
+    viewfn(rf.post("/"))
+    viewfn(rf.get("/"))
+    viewfn(rf.get("/"))
+    assert len(calls) == 3
+
+
+def test_cache_only_successful_responses(rf: RequestFactory):
+    calls = []
+
+    @view(cache=CachePolicy())
+    def viewfn(_request):
+        calls.append(1)
+        return HttpResponse("body", status=404)
+
+    viewfn(rf.get("/"))
+    viewfn(rf.get("/"))
+    assert len(calls) == 2
+
+
+def test_cache_key_params(rf: RequestFactory):
+    calls = []
+
+    @view(cache=CachePolicy(params=["p1"]))
+    def viewfn(_request, p1: str = param(), p2: str = param()):
+        calls.append((p1, p2))
+        return HttpResponse(f"{p1} {p2}")
+
+    assert viewfn(rf.get("/?p1=a&p2=x")).content == b"a x"
+    assert viewfn(rf.get("/?p1=a&p2=y")).content == b"a x"
+    assert calls == [("a", "x")]
+
+
+def test_cache_key_user_attrs(rf: RequestFactory):
+    calls = []
+
+    @view(cache=CachePolicy(user_attrs=["pk"]))
+    def viewfn(request):
+        calls.append(request.user.pk)
+        return HttpResponse(f"user {request.user.pk}")
+
+    def request_for(pk: int):
+        request = rf.get("/")
+        request.user = SimpleNamespace(pk=pk)
+        return request
+
+    assert viewfn(request_for(1)).content == b"user 1"
+    assert viewfn(request_for(2)).content == b"user 2"
+    assert viewfn(request_for(1)).content == b"user 1"
+    assert calls == [1, 2]
+
+
+@pytest.mark.django_db
+def test_cache_key_model_param(rf: RequestFactory):
+    user = AppUser.objects.create(username="user")
+    calls = []
+
+    @view(cache=CachePolicy())
+    def viewfn(_request, u: AppUser = param()):
+        calls.append(u.pk)
+        return HttpResponse(u.username)
+
+    viewfn(rf.get(f"/?u={user.pk}"))
+    viewfn(rf.get(f"/?u={user.pk}"))
+    assert calls == [user.pk]
+
+
+def test_cached_child_element_in_parent(rf: RequestFactory):
+    calls = []
+
+    @view()
+    def parent(request):
+        return HttpResponse("<p>" + str(child(request)) + "</p>")
+
+    @element(cache=CachePolicy())
+    def child(_request):
+        calls.append(1)
+        return HttpResponse("child")
+
+    first = parent(rf.get("/"))
+    second = parent(rf.get("/"))
+    assert len(calls) == 1
+    assert first.content == second.content
+    assert second.content.count(b"<div id='child'") == 1
+
+
+def test_async_element_cache(rf: RequestFactory):
+    calls = []
+
+    @element(cache=CachePolicy())
+    async def viewfn(_request):
+        calls.append(1)
+        return HttpResponse("body")
+
+    first = async_to_sync(viewfn)(rf.get("/"))
+    second = async_to_sync(viewfn)(rf.get("/"))
+    assert len(calls) == 1
+    assert second.content == first.content
+
+
+@pytest.mark.django_db
+def test_track_instances_invalidates_on_save_and_delete(rf: RequestFactory):
+    user = AppUser.objects.create(username="user")
+    other = AppUser.objects.create(username="other")
+    calls = []
+
+    @element(cache=CachePolicy(timeout=None, track_instances=True))
+    def viewfn(_request, u: AppUser = param()):
+        calls.append(u.username)
+        return HttpResponse(u.username)
+
+    viewfn(rf.get(f"/?u={user.pk}"))
+    viewfn(rf.get(f"/?u={user.pk}"))
+    assert calls == ["user"]
+
+    other.save()
+    viewfn(rf.get(f"/?u={user.pk}"))
+    assert calls == ["user"]
+
+    user.username = "renamed"
+    user.save()
+    assert b"renamed" in viewfn(rf.get(f"/?u={user.pk}")).content
+    viewfn(rf.get(f"/?u={user.pk}"))
+    assert calls == ["user", "renamed"]
+
+
+@pytest.mark.django_db
+def test_track_all_loaded_instances(rf: RequestFactory):
+    user = AppUser.objects.create(username="user")
+    calls = []
+
+    @view(cache=CachePolicy(timeout=None, track_instances="all"))
+    def parent(request):
+        return HttpResponse("<p>" + str(child(request)) + "</p>")
+
+    @element(cache=CachePolicy(timeout=None, track_instances="all"))
+    def child(_request):
+        calls.append(1)
+        loaded = AppUser.objects.filter(pk=user.pk).first()
+        return HttpResponse(loaded.username if loaded else "deleted")
+
+    parent(rf.get("/"))
+    parent(rf.get("/"))
+    assert len(calls) == 1
+
+    user.username = "renamed"
+    user.save()
+    assert b"renamed" in parent(rf.get("/")).content
+    assert len(calls) == 2
+
+    user.delete()
+    assert b"deleted" in parent(rf.get("/")).content
+    assert len(calls) == 3
+
+
+def test_cache_key_vary_headers(rf: RequestFactory):
+    calls = []
+
+    @view(cache=CachePolicy())
+    def viewfn(request):
+        calls.append(1)
+        return render_page(
+            request, "dfv/tests/BlockChild.html", {"foo": 1, "outside": "x"}
+        )
+
+    htmx = viewfn(rf.get("/", headers={"HX-Request": "true"}))
+    full = viewfn(rf.get("/"))
+    assert "<html>" not in response_to_str(htmx)
+    assert "<html>" in response_to_str(full)
+    assert len(calls) == 2
+
+    assert viewfn(rf.get("/", headers={"HX-Request": "true"})).content == (htmx.content)
+    assert viewfn(rf.get("/")).content == full.content
+    assert len(calls) == 2
+
+
+def test_cache_skips_vary_star(rf: RequestFactory):
+    calls = []
+
+    @view(cache=CachePolicy())
+    def viewfn(_request):
+        calls.append(1)
+        response = HttpResponse("body")
+        response["Vary"] = "*"
+        return response
+
+    viewfn(rf.get("/"))
+    viewfn(rf.get("/"))
+    assert len(calls) == 2
+
+
+def test_cache_skips_responses_with_csrf_token(rf: RequestFactory):
+    calls = []
+
+    @element(cache=CachePolicy())
+    def form(request):
+        calls.append(1)
+        return HttpResponse(f"<form>{get_token(request)}</form>")
+
+    def request_for(csrf_cookie: str):
+        request = rf.get("/")
+        request.META["CSRF_COOKIE"] = csrf_cookie
+        return request
+
+    first = form(request_for("a" * 32))
+    second = form(request_for("b" * 32))
+    assert len(calls) == 2
+    assert first.content != second.content
+
+
+def test_cache_skips_template_responses_with_csrf_token(rf: RequestFactory):
+    calls = []
+
+    @view(cache=CachePolicy())
+    def page(request):
+        calls.append(1)
+        return TemplateResponse(request, "dfv/tests/CsrfForm.html")
+
+    page(rf.get("/"))
+    page(rf.get("/"))
+    assert len(calls) == 2
+
+
+def test_cache_csrf_token_used_before_view(rf: RequestFactory):
+    calls = []
+
+    @element(cache=CachePolicy())
+    def viewfn(_request):
+        calls.append(1)
+        return HttpResponse("body")
+
+    request = rf.get("/")
+    get_token(request)
+    viewfn(request)
+    viewfn(request)
+    assert len(calls) == 1
+    assert request.META["CSRF_COOKIE_NEEDS_UPDATE"]
@@ -0,0 +1,128 @@
+import datetime
+import functools
+import hashlib
+import inspect
+from typing import Any, Callable, cast, Optional
+
+from django.db import models
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from dfv.cache import _key_value
+from dfv.utils import _get_request_from_args
+from dfv.view_stack import is_view_fn_request_target
+
+
+def _is_conditional_request(request: HttpRequest) -> bool:
+    return request.method in ("GET", "HEAD")
+
+
+def content_etag(content: bytes) -> str:
+    return quote_etag(hashlib.blake2b(content, digest_size=16).hexdigest())
+
+
+def apply_etag(request: HttpRequest, response: Any) -> Any:
+    """
+    Sets an ETag with a hash of the final body, including swap-oob fragments,
+    and answers a matching If-None-Match header with 304 Not Modified.
+    """
+    if (
+        not _is_conditional_request(request)
+        or not isinstance(response, HttpResponse)
+        or response.status_code != 200
+    ):
+        return response
+
+    if not response.has_header("ETag"):
+        response["ETag"] = content_etag(response.content)
+    return get_conditional_response(request, etag=response["ETag"], response=response)
+
+
+FRESHNESS = str | Callable[[models.Model], Any]
+
+
+def _freshness_values(arguments: dict[str, Any], freshness: FRESHNESS) -> list[Any]:
+    values = []
+    for value in arguments.values():
+        for v in value if isinstance(value, (list, tuple)) else [value]:
+            if isinstance(v, models.Model):
+                values.append(
+                    getattr(v, freshness)
+                    if isinstance(freshness, str)
+                    else freshness(v)
+                )
+    return values
+
+
+def freshness_view_fn(fn: Callable, freshness: FRESHNESS) -> Callable:
+    """
+    Wraps a view fn whose output only depends on its arguments and the model
+    instances passed to it. `freshness` is the name of a field of these models,
+    e.g. `updated_at` or a version column, or a function that returns the
+    freshness value of an instance.
+
+    For the request target, an ETag (and a Last-Modified date, if all values are
+    datetimes) is derived from the arguments and the freshness values. Matching
+    If-None-Match or If-Modified-Since headers are answered with 304 Not
+    Modified without calling the view fn.
+    """
+    signature = inspect.signature(fn)
+    fn_name = f"{fn.__module__}.{fn.__qualname__}"
+
+    def validators(args, kwargs) -> Optional[tuple[str, Optional[int]]]:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        values = _freshness_values(bound.arguments, freshness)
+        if not values:
+            # without model instances, there is nothing to judge freshness by
+            return None
+
+        parts = [fn_name]
+        parts += [f"{n}={_key_value(v)}" for n, v in list(bound.arguments.items())[1:]]
+        parts += [repr(v) for v in values]
+        etag = content_etag("\n".join(parts).encode("UTF-8"))
+        # HTTP dates have a precision of seconds
+        last_modified = (
+            int(max(v.timestamp() for v in values))
+            if all(isinstance(v, datetime.datetime) for v in values)
+            else None
+        )
+        return etag, last_modified
+
+    def set_validators(response: Any, etag: str, last_modified: Optional[int]):
+        if isinstance(response, HttpResponse) and response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def check(args, kwargs) -> tuple[Optional[tuple[str, Optional[int]]], Any]:
+        request = _get_request_from_args(cast(Any, args))
+        if not _is_conditional_request(request) or not is_view_fn_request_target(
+            request
+        ):
+            return None, None
+
+        result = validators(args, kwargs)
+        if result is None:
+            return None, None
+        return result, get_conditional_response(
+            request, etag=result[0], last_modified=result[1]
+        )
+
+    @functools.wraps(fn)
+    def inner(*args, **kwargs):
+        result, response = check(args, kwargs)
+        if response is None:
+            response = fn(*args, **kwargs)
+        return set_validators(response, *result) if result else response
+
+    @functools.wraps(fn)
+    async def async_inner(*args, **kwargs):
+        result, response = check(args, kwargs)
+        if response is None:
+            response = await fn(*args, **kwargs)
+        return set_validators(response, *result) if result else response
+
+    return async_inner if inspect.iscoroutinefunction(fn) else inner
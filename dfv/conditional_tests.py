@@ -0,0 +1,141 @@
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from dfv import element, param, view
+from dfv.response_handler import hook_swap_oob
+from main.models import AppUser
+
+
+def test_view_etag_not_modified(rf: RequestFactory):
+    @view(etag=True)
+    def viewfn(_request):
+        return HttpResponse("body")
+
+    response = viewfn(rf.get("/"))
+    assert response.status_code == 200
+    etag = response["ETag"]
+
+    response = viewfn(rf.get("/", HTTP_IF_NONE_MATCH=etag))
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response["ETag"] == etag
+
+
+def test_view_etag_changed_content(rf: RequestFactory):
+    content = ["a"]
+
+    @view(etag=True)
+    def viewfn(_request):
+        return HttpResponse(content[0])
+
+    etag = viewfn(rf.get("/"))["ETag"]
+    content[0] = "b"
+    response = viewfn(rf.get("/", HTTP_IF_NONE_MATCH=etag))
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_view_etag_only_for_get(rf: RequestFactory):
+    @view(etag=True)
+    def viewfn(_request):
+        return HttpResponse("body")
+
+    assert not viewfn(rf.post("/")).has_header("ETag")
+
+
+def test_etag_includes_swap_oob(rf: RequestFactory):
+    oob = [False]
+
+    @view(etag=True)
+    def viewfn(request):
+        if oob[0]:
+            hook_swap_oob(request, HttpResponse("<div id='oob'>oob</div>"))
+        return HttpResponse("body")
+
+    etag = viewfn(rf.get("/"))["ETag"]
+    oob[0] = True
+    response = viewfn(rf.get("/", HTTP_IF_NONE_MATCH=etag))
+    assert response.status_code == 200
+    assert b"hx-swap-oob" in response.content
+
+
+def test_element_etag_hashes_wrapped_body(rf: RequestFactory):
+    @element(etag=True)
+    def root(request):
+        return HttpResponse("<p>" + str(child(request)) + "</p>")
+
+    @element(etag=True)
+    def child(_request):
+        return HttpResponse("child")
+
+    response = root(rf.get("/"))
+    assert response.content.startswith(b"<div id='root'")
+    etag = response["ETag"]
+    assert root(rf.get("/", HTTP_IF_NONE_MATCH=etag)).status_code == 304
+    assert child(rf.get("/"))["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_freshness_not_modified_skips_view_fn(
+    rf: RequestFactory, django_assert_num_queries
+):
+    user = AppUser.objects.create(username="user")
+    calls = []
+
+    @element(freshness="date_joined")
+    def viewfn(_request, u: AppUser = param()):
+        calls.append(u.pk)
+        return HttpResponse(u.username)
+
+    response = viewfn(rf.get(f"/?u={user.pk}"))
+    assert response.status_code == 200
+    assert response.content.startswith(b"<div id='viewfn'")
+    etag = response["ETag"]
+    last_modified = response["Last-Modified"]
+
+    with django_assert_num_queries(1):
+        response = viewfn(rf.get(f"/?u={user.pk}", HTTP_IF_NONE_MATCH=etag))
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert response.content == b""
+
+    response = viewfn(rf.get(f"/?u={user.pk}", HTTP_IF_MODIFIED_SINCE=last_modified))
+    assert response.status_code == 304
+    assert len(calls) == 1
+
+
+@pytest.mark.django_db
+def test_freshness_changed_instance(rf: RequestFactory):
+    user = AppUser.objects.create(username="user")
+
+    @view(freshness=lambda u: u.username)
+    def viewfn(_request, u: AppUser = param()):
+        return HttpResponse(u.username)
+
+    etag = viewfn(rf.get(f"/?u={user.pk}"))["ETag"]
+    user.username = "renamed"
+    user.save()
+    response = viewfn(rf.get(f"/?u={user.pk}", HTTP_IF_NONE_MATCH=etag))
+    assert response.status_code == 200
+    assert response.content == b"renamed"
+    assert not response.has_header("Last-Modified")
+
+
+@pytest.mark.django_db
+def test_freshness_only_for_request_target(rf: RequestFactory):
+    user = AppUser.objects.create(username="user")
+
+    @view()
+    def parent(request):
+        return HttpResponse(str(child(request, user)))
+
+    @view(freshness="date_joined")
+    def child(_request, u: AppUser):
+        return HttpResponse(u.username)
+
+    assert child(rf.get("/"), user).has_header("ETag")
+    etag = child(rf.get("/"), user)["ETag"]
+    response = parent(rf.get("/", HTTP_IF_NONE_MATCH=etag))
+    assert response.status_code == 200
+    assert response.content == b"user"
@@ -0,0 +1,238 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import lxml.etree
+import lxml.html
+from django.core.cache import caches, DEFAULT_CACHE_ALIAS
+from django.core.cache.backends.base import BaseCache
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django_htmx.http import reswap
+
+from dfv.htmx import get_htmx
+from dfv.utils import response_to_bytes
+
+DIFF_VERSION_HEADER = "DFV-Diff-Version"
+DIFF_VERSION_ATTR = "dfv-diff-version"
+
+# htmx parses a response in the context of its first tag, so all swapped
+# subtrees must be parsable in the same context
+_PARSE_CONTEXTS = {
+    "td": "tr",
+    "th": "tr",
+    "tr": "tbody",
+    "col": "colgroup",
+    "thead": "table",
+    "tbody": "table",
+    "tfoot": "table",
+    "colgroup": "table",
+    "caption": "table",
+}
+
+_SIMPLE_ID = re.compile(r"[A-Za-z][\w-]*")
+
+# a list of (CSS selector, new subtree)
+CHANGES = list[tuple[str, lxml.html.HtmlElement]]
+
+
+@dataclass(frozen=True)
+class DiffPolicy:
+    """
+    Sends only the changed parts of an element when the element is rendered
+    again for an htmx request that targets it.
+
+    Every rendered version of the element is stored in the cache, keyed by a
+    hash of its content, and the element carries the hash in its
+    `dfv-diff-version` attribute. dfv.js sends it back with requests that
+    target the element. The new version is compared with the stored one, and
+    the changed subtrees are sent as hx-swap-oob swaps with a CSS selector,
+    while the element itself is not swapped (HX-Reswap: none).
+
+    The whole element is sent if the stored version expired, if the element's
+    own tag or attributes changed, or if the changes are not smaller.
+    """
+
+    timeout: Optional[float] = 300
+    cache_alias: str = DEFAULT_CACHE_ALIAS
+
+    def get_cache(self) -> BaseCache:
+        return caches[self.cache_alias]
+
+
+def _version_key(element_id: str, version: str) -> str:
+    return f"dfv.diff:{element_id}:{version}"
+
+
+def add_diff_version(
+    response: HttpResponse, attrs: Optional[dict[str, str]]
+) -> dict[str, str]:
+    """
+    Returns the element attributes with the version of the response's content,
+    which is marked on the response for apply_diff().
+    """
+    attrs = dict(attrs or {})
+    # the chunks of a view response exclude its swap-oob fragments, accessing
+    # its content would join them
+    chunks = getattr(response, "chunks", None)
+    content = response_to_bytes(response) if chunks is None else b"".join(chunks)
+    digest = hashlib.blake2b(content, digest_size=16)
+    digest.update(repr(sorted(attrs.items())).encode("UTF-8"))
+    version = digest.hexdigest()
+    setattr(response, "_dfv_diff_version", version)
+    return {**attrs, DIFF_VERSION_ATTR: version}
+
+
+def _attrs(el: lxml.html.HtmlElement, ignore: tuple[str, ...] = ()) -> dict[str, str]:
+    return {k: v for k, v in el.attrib.items() if k not in ignore}
+
+
+def _diff(
+    old: lxml.html.HtmlElement,
+    new: lxml.html.HtmlElement,
+    selector: str,
+    ignore_attrs: tuple[str, ...] = (),
+) -> Optional[CHANGES]:
+    """
+    Returns the changed subtrees of `new`, or None if the node itself changed.
+    """
+    if (
+        old.tag != new.tag
+        or old.text != new.text
+        or len(old) != len(new)
+        or _attrs(old, ignore_attrs) != _attrs(new, ignore_attrs)
+    ):
+        return None
+
+    changes: CHANGES = []
+    index = 0
+    for old_child, new_child in zip(old, new):
+        if old_child.tail != new_child.tail:
+            return None
+        if not isinstance(new_child.tag, str) or not isinstance(old_child.tag, str):
+            # comments can not be selected, they must not change
+            if old_child.tag != new_child.tag or old_child.text != new_child.text:
+                return None
+            continue
+
+        index += 1
+        child_id = new_child.get("id")
+        child_selector = (
+            f"#{child_id}"
+            if child_id is not None
+            and child_id == old_child.get("id")
+            and _SIMPLE_ID.fullmatch(child_id)
+            else f"{selector} > :nth-child({index})"
+        )
+        child_changes = _diff(old_child, new_child, child_selector)
+        changes += (
+            [(child_selector, new_child)] if child_changes is None else child_changes
+        )
+    return changes
+
+
+def _add_implicit_tbody(root: lxml.html.HtmlElement):
+    # browsers put the rows of a table into a tbody, the selectors must match
+    for table in list(root.iter("table")):
+        rows = [c for c in table if c.tag == "tr"]
+        if rows:
+            tbody = lxml.html.Element("tbody")
+            table.insert(table.index(rows[0]), tbody)
+            tbody.extend(rows)
+
+
+def _to_fragments(changes: CHANGES, swap_oob: bytes) -> Optional[list[bytes]]:
+    contexts = {_PARSE_CONTEXTS.get(el.tag, "div") for _, el in changes}
+    if swap_oob:
+        # the element's own swap-oob fragments are parsed with the changes
+        contexts.add("div")
+    if len(contexts) > 1:
+        return None
+
+    fragments = []
+    for selector, el in changes:
+        el.attrib["hx-swap-oob"] = f"outerHTML:{selector}"
+        fragments.append(lxml.html.tostring(el, with_tail=False))
+    return fragments
+
+
+def _diff_fragments(
+    old_content: bytes, new_content: bytes, element_id: str, swap_oob: bytes
+) -> Optional[list[bytes]]:
+    try:
+        old = lxml.html.fragment_fromstring(old_content)
+        new = lxml.html.fragment_fromstring(new_content)
+    except lxml.etree.ParserError:
+        return None
+    _add_implicit_tbody(old)
+    _add_implicit_tbody(new)
+
+    changes = _diff(old, new, f"#{element_id}", (DIFF_VERSION_ATTR,))
+    if changes is None:
+        return None
+
+    fragments = _to_fragments(changes, swap_oob)
+    if fragments is None:
+        return None
+    if sum(len(f) for f in fragments) >= len(new_content):
+        return None
+    return fragments
+
+
+def _is_diff_request(request: HttpRequest, element_id: str) -> bool:
+    htmx = get_htmx(request)
+    return (
+        bool(htmx)
+        and htmx.target == element_id
+        and DIFF_VERSION_HEADER in request.headers
+        and _SIMPLE_ID.fullmatch(element_id) is not None
+    )
+
+
+def apply_diff(
+    request: HttpRequest,
+    response: Any,
+    policy: DiffPolicy,
+    element_id: str,
+    request_target: bool,
+) -> Any:
+    """
+    Stores the version of an element's response and, for a request that targets
+    the element with a known version, replaces the response with the changes.
+    """
+    if not isinstance(response, HttpResponse) or response.status_code != 200:
+        return response
+    version = response.__dict__.pop("_dfv_diff_version", None)
+    chunks = getattr(response, "chunks", None)
+    if version is None or chunks is None:
+        return response
+
+    content = b"".join(chunks)
+    cache = policy.get_cache()
+    cache.add(_version_key(element_id, version), content, policy.timeout)
+    if not request_target:
+        return response
+
+    patch_vary_headers(response, (DIFF_VERSION_HEADER,))
+    response[DIFF_VERSION_HEADER] = version
+    if not _is_diff_request(request, element_id):
+        return response
+
+    old_version = request.headers[DIFF_VERSION_HEADER]
+    old_content = cache.get(_version_key(element_id, old_version))
+    if old_content is None:
+        return response
+
+    swap_oob = b"".join(getattr(response, "swap_oob_chunks", []))
+    fragments = _diff_fragments(old_content, content, element_id, swap_oob)
+    if fragments is None:
+        return response
+
+    diff = HttpResponse(
+        b"".join([*fragments, swap_oob]),
+        status=response.status_code,
+        headers=dict(response.items()),
+    )
+    diff.cookies = response.cookies
+    return reswap(diff, "none")
@@ -0,0 +1,132 @@
+import lxml.html
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from dfv import DiffPolicy, element, view
+from dfv.diff import DIFF_VERSION_ATTR, DIFF_VERSION_HEADER
+from dfv.response_handler import hook_swap_oob
+from dfv.utils import response_to_str
+
+
+def _version(response: HttpResponse) -> str:
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(response_to_str(response))
+    return parsed.attrib[DIFF_VERSION_ATTR]
+
+
+def _diff_request(rf: RequestFactory, version: str, target="table"):
+    return rf.get(
+        "/",
+        HTTP_HX_REQUEST="true",
+        HTTP_HX_TARGET=target,
+        HTTP_DFV_DIFF_VERSION=version,
+    )
+
+
+def _table_element(cells: dict):
+    @element("table", diff=DiffPolicy())
+    def table(_request):
+        rows = "".join(
+            f"<tr><td>{k}</td><td>{v}</td></tr>"
+            for k, v in cells.items()
+            if k != "title"
+        )
+        return HttpResponse(
+            f"<p id='title'>{cells.get('title')}</p><table>{rows}</table>"
+        )
+
+    return table
+
+
+def test_diff_sends_changed_cells(rf: RequestFactory):
+    cells = {"a": 1, "b": 2, "c": 3}
+    table = _table_element(cells)
+    first = table(rf.get("/"))
+    assert first[DIFF_VERSION_HEADER] == _version(first)
+    assert DIFF_VERSION_HEADER in first["Vary"]
+
+    cells["b"] = 20
+    response = table(_diff_request(rf, _version(first)))
+    assert response["HX-Reswap"] == "none"
+    assert response.content == (
+        b'<td hx-swap-oob="outerHTML:#table &gt; :nth-child(2) &gt; :nth-child(1) '
+        b'&gt; :nth-child(2) &gt; :nth-child(2)">20</td>'
+    )
+    # the client gets the version of the complete element
+    assert response[DIFF_VERSION_HEADER] == _version(table(rf.get("/")))
+
+
+def test_diff_selects_changed_subtrees_by_id(rf: RequestFactory):
+    cells = {"title": "old"}
+    table = _table_element(cells)
+    first = table(rf.get("/"))
+
+    cells["title"] = "new"
+    response = table(_diff_request(rf, _version(first)))
+    assert response.content == b'<p id="title" hx-swap-oob="outerHTML:#title">new</p>'
+
+
+def test_diff_without_changes(rf: RequestFactory):
+    table = _table_element({"a": 1})
+    first = table(rf.get("/"))
+    response = table(_diff_request(rf, _version(first)))
+    assert response.content == b""
+    assert response["HX-Reswap"] == "none"
+
+
+def test_diff_sends_element_for_unknown_version(rf: RequestFactory):
+    table = _table_element({"a": 1})
+    response = table(_diff_request(rf, "unknown"))
+    assert "HX-Reswap" not in response
+    assert _version(response) == response[DIFF_VERSION_HEADER]
+
+
+def test_diff_sends_element_for_mixed_contexts(rf: RequestFactory):
+    cells = {"title": "old", "a": 1}
+    table = _table_element(cells)
+    first = table(rf.get("/"))
+
+    # a <p> and a <td> can not be parsed in the same context
+    cells.update(title="new", a=2)
+    response = table(_diff_request(rf, _version(first)))
+    assert "HX-Reswap" not in response
+    assert b"<table>" in response.content
+
+
+def test_diff_only_for_requests_that_target_the_element(rf: RequestFactory):
+    cells = {"a": 1}
+    table = _table_element(cells)
+    version = _version(table(rf.get("/")))
+
+    cells["a"] = 2
+    response = table(_diff_request(rf, version, target="other"))
+    assert "HX-Reswap" not in response
+
+    @view()
+    def page(request):
+        return HttpResponse(str(table(request)))
+
+    response = page(_diff_request(rf, version))
+    assert "HX-Reswap" not in response
+    assert DIFF_VERSION_HEADER not in response
+
+
+def test_diff_keeps_swap_oob_fragments_outside_of_element(rf: RequestFactory):
+    title = {"text": "old"}
+
+    @element("box", diff=DiffPolicy())
+    def box(request):
+        hook_swap_oob(request, HttpResponse("<div id='other'>o</div>"))
+        return HttpResponse(f"<p id='title'>{title['text']}</p><p>main</p>")
+
+    first = box(rf.get("/"))
+    parsed = lxml.html.fragments_fromstring(response_to_str(first))
+    assert [el.attrib["id"] for el in parsed] == ["box", "other"]
+    assert parsed[1].attrib["hx-swap-oob"] == "outerHTML:#other"
+
+    title["text"] = "new"
+    response = box(_diff_request(rf, parsed[0].attrib[DIFF_VERSION_ATTR], "box"))
+    assert response["HX-Reswap"] == "none"
+    assert response.content == (
+        b'<p id="title" hx-swap-oob="outerHTML:#title">new</p>'
+        b'<div id="other" hx-swap-oob="outerHTML:#other">o</div>'
+    )
@@ -1,13 +1,35 @@
 import functools
+import inspect
 import lxml.html
 
 from typing import Any, Callable, cast, Optional, Tuple
 
-from django.http import HttpResponse
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse
+from django.utils.html import escape
 from django_htmx.http import reswap, retarget
 
-from dfv.utils import response_to_str
-from dfv.view import view, VIEW_FN, ViewResponse
+from dfv.cache import (
+    astore_cached_response,
+    cache_view_fn,
+    CachePolicy,
+    is_cache_hit,
+    store_cached_response,
+)
+from dfv.conditional import apply_etag, FRESHNESS
+from dfv.diff import add_diff_version, apply_diff, DiffPolicy
+from dfv.poll import poll_view_fn, PollPolicy, pop_poll_attrs
+from dfv.route import reverse_view
+from dfv.stream import render_out_of_order
+from dfv.utils import _encode_params
+from dfv.view import (
+    get_dispatch_target,
+    TargetElementRendered,
+    view,
+    VIEW_FN,
+    ViewResponse,
+)
+from dfv.view_stack import get_view_fn_call_stack_from_request
 
 
 def split_content_and_swap_oob(content: str) -> Tuple[str, str]:
@@ -28,6 +50,8 @@ def split_content_and_swap_oob(content: str) -> Tuple[str, str]:
 
 
 class ElementResponse(ViewResponse):
+    __slots__ = ("_dfv_element_id",)
+
     @staticmethod
     def empty() -> HttpResponse:
         return ElementResponse(HttpResponse(), None, no_element_wrap=True)
@@ -41,23 +65,32 @@ class ElementResponse(ViewResponse):
         hx_swap="outerHTML",
         classes: Optional[str] = None,
         no_element_wrap=False,
+        attrs: Optional[dict[str, str]] = None,
     ):
-        if no_element_wrap:
+        super().__init__(response)
+        self._dfv_element_id = element_id
+        if no_element_wrap or self._dfv_chunks is None:
             return
 
         attr_id = f"id='{element_id}'" if element_id is not None else ""
         attr_hx_target = f"hx-target='{hx_target}'" if hx_target else ""
         attr_hx_swap = f"hx-swap='{hx_swap}'" if hx_swap else ""
         attr_classes = f"class='{classes}'" if classes else ""
-        content = response_to_str(response)
-        wrapped = (
-            f"""<{tag} {attr_id} {attr_hx_target} {attr_hx_swap} {attr_classes}>"""
-            f"""{content}"""
-            f"""</{tag}>"""
+        attr_others = "".join(
+            f' {name}="{escape(value)}"' for name, value in (attrs or {}).items()
         )
+        start_tag = f"""<{tag} {attr_id} {attr_hx_target} {attr_hx_swap} {attr_classes}{attr_others}>"""
+        end_tag = f"""</{tag}>"""
 
-        response.content = bytes(wrapped, "UTF-8")
-        super().__init__(response)
+        self._dfv_chunks = [
+            start_tag.encode("UTF-8"),
+            *self._dfv_chunks,
+            end_tag.encode("UTF-8"),
+        ]
+
+    @property
+    def element_id(self) -> Optional[str]:
+        return self._dfv_element_id
 
 
 def body_response(response: HttpResponse, hx_swap="outerHTML") -> HttpResponse:
@@ -66,6 +99,28 @@ def body_response(response: HttpResponse, hx_swap="outerHTML") -> HttpResponse:
     return ElementResponse(response, None, no_element_wrap=True)
 
 
+def lazy_element(
+    element_fn: Callable, params: Optional[dict[str, Any]] = None, trigger="load"
+) -> HttpResponse:
+    """
+    Returns an empty placeholder of an element that loads the element with a
+    separate htmx request, by default as soon as the placeholder is loaded. Use
+    trigger="revealed" to load elements below the fold when they are scrolled
+    into view.
+
+    The request goes to the element's URL, see reverse_view(). `params` are
+    encoded as query parameters, which the element reads with param(). Model
+    instances are encoded with their primary key.
+    """
+    placeholder = getattr(element_fn, "__dfv_lazy_placeholder__", None)
+    if placeholder is None:
+        raise Exception(f"'{element_fn}' is not an element.")
+
+    url = reverse_view(element_fn)
+    query = _encode_params(params or {})
+    return placeholder(f"{url}?{query}" if query else url, trigger)
+
+
 def element(
     element_id: Optional[str] = None,
     *,
@@ -76,24 +131,63 @@ def element(
     handle_args=True,
     decorators: Optional[list[Callable]] = None,
     login_required=False,
+    cache: Optional[CachePolicy] = None,
+    etag=False,
+    freshness: Optional[FRESHNESS] = None,
+    poll: Optional[PollPolicy] = None,
+    out_of_order=False,
+    lazy=False,
+    diff: Optional[DiffPolicy] = None,
 ) -> Callable[[VIEW_FN], VIEW_FN]:
+    """
+    With a DiffPolicy, an htmx request that targets the element only gets the
+    parts of the element that changed since the client's version.
+
+    With `lazy=True`, an element called by another view outputs a placeholder
+    that loads the element with a separate request after the page is shown.
+    The arguments of the call are passed as query parameters, see
+    lazy_element(). Requests to the element's own URL render it as usual.
+
+    With `out_of_order=True`, the element is rendered in the background when the
+    root view of a view(stream=True) calls it. The element outputs an empty
+    placeholder with its id right away, so the rest of the page keeps
+    streaming, and its content is appended as a swap-oob fragment at the end
+    of the response. The element's injected params are consumed and loaded
+    before, in call order. Its view fn runs concurrently with the rest of the
+    page, sync elements in a worker thread outside of the request's
+    transaction, see render_concurrently().
+    """
+
     def decorator(f: VIEW_FN) -> VIEW_FN:
         id = element_id if isinstance(element_id, str) else f.__name__
+        signature = inspect.signature(f)
+        if cache is not None:
+            # the element stores the response after wrapping it with its tag
+            f = cast(VIEW_FN, cache_view_fn(f, cache))
+        if poll is not None:
+            f = cast(VIEW_FN, poll_view_fn(f, poll, id, lambda: decorated))
         f = view(
             handle_args=handle_args,
             decorators=decorators,
             login_required=login_required,
+            freshness=freshness,
         )(f)
+        bind_args = getattr(f, "__dfv_bind_args__", None)
 
-        @functools.wraps(f)
-        def inner(*args, **kwargs) -> HttpResponse:
-            response = f(*args, **kwargs)
-            if not response["Content-Type"].startswith("text/html"):
+        def wrap(response: HttpResponse) -> HttpResponse:
+            if (
+                response.streaming
+                or response.status_code in (204, 304)
+                or not response.get("Content-Type", "").startswith("text/html")
+            ):
                 return response
 
-            if isinstance(response, ElementResponse):
+            if isinstance(response, ElementResponse) or is_cache_hit(response):
                 return response
 
+            attrs = pop_poll_attrs(response)
+            if diff is not None:
+                attrs = add_diff_version(response, attrs)
             return ElementResponse(
                 response,
                 element_id=id,
@@ -101,8 +195,108 @@ def element(
                 hx_target=hx_target,
                 hx_swap=hx_swap,
                 classes=classes,
+                attrs=attrs,
             )
 
-        return cast(VIEW_FN, inner)
+        def is_request_target(request: HttpRequest) -> bool:
+            return etag and not get_view_fn_call_stack_from_request(request, False)
+
+        def dispatch(request: HttpRequest, response: HttpResponse):
+            # only nested elements interrupt the rendering of the request target
+            if get_dispatch_target(
+                request
+            ) == id and get_view_fn_call_stack_from_request(request, False):
+                raise TargetElementRendered(response)
+
+        def placeholder() -> HttpResponse:
+            return ElementResponse(
+                HttpResponse(),
+                element_id=id,
+                tag=tag,
+                hx_target=hx_target,
+                hx_swap=hx_swap,
+                classes=classes,
+                attrs={"aria-busy": "true"},
+            )
+
+        def lazy_placeholder(url: str, trigger: str) -> HttpResponse:
+            # the loaded element replaces the placeholder, whatever its hx-swap
+            return ElementResponse(
+                HttpResponse(),
+                element_id=id,
+                tag=tag,
+                classes=classes,
+                attrs={"hx-get": url, "hx-trigger": trigger, "aria-busy": "true"},
+            )
+
+        def load_lazily(request: HttpRequest) -> bool:
+            return lazy and bool(get_view_fn_call_stack_from_request(request, False))
+
+        def lazy_call_placeholder(args, kwargs) -> HttpResponse:
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            params = dict(list(arguments.items())[1:])
+            return lazy_element(decorated, params)
+
+        def is_diff_target(request: HttpRequest) -> bool:
+            return get_dispatch_target(
+                request
+            ) == id or not get_view_fn_call_stack_from_request(request, False)
+
+        def render(*args, **kwargs) -> HttpResponse:
+            request_target = is_request_target(args[0])
+            response = store_cached_response(wrap(f(*args, **kwargs)))
+            if diff is not None:
+                response = apply_diff(
+                    args[0], response, diff, id, is_diff_target(args[0])
+                )
+            dispatch(args[0], response)
+            return apply_etag(args[0], response) if request_target else response
+
+        async def arender(*args, **kwargs) -> HttpResponse:
+            request_target = is_request_target(args[0])
+            response = await astore_cached_response(wrap(await f(*args, **kwargs)))
+            if diff is not None:
+                response = await sync_to_async(apply_diff)(
+                    args[0], response, diff, id, is_diff_target(args[0])
+                )
+            dispatch(args[0], response)
+            return apply_etag(args[0], response) if request_target else response
+
+        @functools.wraps(f)
+        def inner(*args, **kwargs) -> HttpResponse:
+            if load_lazily(args[0]):
+                return lazy_call_placeholder(args, kwargs)
+            if out_of_order:
+                # consume the params in call order and load their model
+                # instances in the request's thread, not in the thread pool
+                replace_response = bind_args(args, kwargs) if bind_args else None
+                if replace_response is not None:
+                    return wrap(replace_response)
+                if render_out_of_order(
+                    args[0], functools.partial(render, *args, **kwargs)
+                ):
+                    return placeholder()
+            return render(*args, **kwargs)
+
+        @functools.wraps(f)
+        async def async_inner(*args, **kwargs) -> HttpResponse:
+            if load_lazily(args[0]):
+                return lazy_call_placeholder(args, kwargs)
+            if out_of_order:
+                replace_response = await bind_args(args, kwargs) if bind_args else None
+                if replace_response is not None:
+                    return wrap(replace_response)
+                if render_out_of_order(
+                    args[0], functools.partial(arender, *args, **kwargs)
+                ):
+                    return placeholder()
+            return await arender(*args, **kwargs)
+
+        decorated = async_inner if inspect.iscoroutinefunction(f) else inner
+        setattr(decorated, "__dfv_element_id__", id)
+        setattr(decorated, "__dfv_lazy_placeholder__", lazy_placeholder)
+        # templates pass elements to {% dfv_lazy_element %} instead of calling them
+        setattr(decorated, "do_not_call_in_templates", True)
+        return cast(VIEW_FN, decorated)
 
     return decorator
@@ -1,10 +1,16 @@
 import django
 import lxml.html
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
 from django.http import HttpResponse
+from django.template import Context, Template
 from django.template.response import TemplateResponse
 from django.test import RequestFactory
 
-from dfv import element, ElementResponse
+from dfv import element, ElementResponse, param, view
+from dfv.element import body_response, lazy_element
+from dfv.route import create_path
 from dfv.utils import response_to_str
 
 
@@ -78,6 +84,40 @@ def test_element_return_template_http_response(rf: RequestFactory):
     assert parsed.text.strip() == "123"
 
 
+def test_nested_elements_compose_bytes(rf: RequestFactory):
+    @element()
+    def root(request):
+        return HttpResponse("<p>" + str(child(request)) + "</p>")
+
+    @element()
+    def child(_request):
+        return HttpResponse("caf\u00e9".encode("UTF-8"))
+
+    result = root(rf.get("/"))
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(response_to_str(result))
+    assert parsed.attrib["id"] == "root"
+    assert parsed.xpath("//div[@id='child']")[0].text == "caf\u00e9"
+    assert result.content.startswith(b"<div")
+
+
+def test_body_response(rf: RequestFactory):
+    @element()
+    def viewfn(_request):
+        return body_response(HttpResponse("body"))
+
+    result = viewfn(rf.get("/"))
+    assert result.content == b"body"
+    assert result["HX-Retarget"] == "body"
+
+
+def test_empty_response(rf: RequestFactory):
+    @element()
+    def viewfn(_request):
+        return ElementResponse.empty()
+
+    assert viewfn(rf.get("/")).content == b""
+
+
 def test_classes(rf: RequestFactory):
     @element(classes="foo bar")
     def viewfn(_request):
@@ -86,3 +126,70 @@ def test_classes(rf: RequestFactory):
     response = viewfn(rf.get("/"))
     parsed: lxml.html.HtmlElement = lxml.html.fromstring(response_to_str(response))
     assert parsed.attrib["class"] == "foo bar"
+
+
+def test_async_element(rf: RequestFactory):
+    @element()
+    async def viewfn(_request):
+        return HttpResponse("body")
+
+    response = async_to_sync(viewfn)(rf.get("/"))
+    _assert_default_values(response)
+
+
+@element(lazy=True, hx_swap="innerHTML")
+def lazy_child(_request, source: str = param(), page: int = param(1)):
+    return HttpResponse(f"{source} {page}")
+
+
+urlpatterns = [create_path(lazy_child, "lazy_child")]
+
+
+@pytest.mark.urls(__name__)
+def test_lazy_element_outputs_placeholder(rf: RequestFactory):
+    @view()
+    def root(request):
+        return HttpResponse(f"{lazy_child(request, source='a b', page=2)}")
+
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(
+        response_to_str(root(rf.get("/")))
+    )
+    assert parsed.attrib["id"] == "lazy_child"
+    assert parsed.attrib["hx-get"] == "/lazy_child?source=a+b&page=2"
+    assert parsed.attrib["hx-trigger"] == "load"
+    assert parsed.attrib["hx-swap"] == "outerHTML"
+    assert parsed.text is None
+
+
+@pytest.mark.urls(__name__)
+def test_lazy_element_renders_for_own_request(rf: RequestFactory):
+    response = lazy_child(rf.get("/lazy_child?source=a+b&page=2"))
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(response_to_str(response))
+    assert parsed.attrib["id"] == "lazy_child"
+    assert parsed.attrib["hx-swap"] == "innerHTML"
+    assert parsed.text == "a b 2"
+
+
+@pytest.mark.urls(__name__)
+def test_lazy_element_encodes_model_instances():
+    user = User(pk=7)
+    response = lazy_element(lazy_child, {"user": user, "ids": [1, 2]}, "revealed")
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(response_to_str(response))
+    assert parsed.attrib["hx-get"] == "/lazy_child?user=7&ids=1&ids=2"
+    assert parsed.attrib["hx-trigger"] == "revealed"
+
+
+@pytest.mark.urls(__name__)
+def test_lazy_element_template_tag():
+    template = Template(
+        "{% load dfv %}{% dfv_lazy_element child source=source trigger='revealed' %}"
+    )
+    content = template.render(Context({"child": lazy_child, "source": "s"}))
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(content)
+    assert parsed.attrib["hx-get"] == "/lazy_child?source=s"
+    assert parsed.attrib["hx-trigger"] == "revealed"
+
+
+def test_lazy_element_requires_element():
+    with pytest.raises(Exception, match="is not an element"):
+        lazy_element(lambda request: HttpResponse())
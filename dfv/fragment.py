@@ -0,0 +1,104 @@
+import inspect
+from typing import Any, Callable, Optional
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.http import HttpRequest, HttpResponse
+from django.utils.safestring import SafeString
+
+from dfv.stream import defer_fragment
+from dfv.utils import response_to_str
+from dfv.view_stack import (
+    fork_view_fn_call_stack,
+    get_view_fn_call_stack_from_request,
+)
+
+
+class Fragment:
+    """
+    A deferred call of a view. The view is called the first time the fragment
+    is output, e.g. when a template renders `{{ fragment }}`. Fragments in
+    template branches that are skipped are never rendered.
+
+    The view runs with the view fn call stack that was active when the
+    fragment was created, so it behaves like a direct call of the view.
+
+    Fragments that a view with `stream=True` outputs are rendered while the
+    response is streamed, see view().
+    """
+
+    __slots__ = ("_request", "_view_fn", "_args", "_kwargs", "_stack", "_response")
+
+    def __init__(
+        self, view_fn: Callable[..., Any], request: HttpRequest, *args, **kwargs
+    ):
+        self._request = request
+        self._view_fn = view_fn
+        self._args = args
+        self._kwargs = kwargs
+        self._stack = list(get_view_fn_call_stack_from_request(request))
+        self._response: Optional[HttpResponse] = None
+
+    @property
+    def rendered(self) -> bool:
+        return self._response is not None
+
+    def render(self) -> HttpResponse:
+        if self._response is None:
+            with fork_view_fn_call_stack(self._request, self._stack):
+                response = self._view_fn(self._request, *self._args, **self._kwargs)
+                if inspect.isawaitable(response):
+
+                    async def wait():
+                        return await response
+
+                    response = async_to_sync(wait)()
+            self._response = response
+        return self._response
+
+    async def arender(self) -> HttpResponse:
+        if self._response is None:
+            if not inspect.iscoroutinefunction(self._view_fn):
+                # sync views may access the database
+                return await sync_to_async(self.render)()
+            with fork_view_fn_call_stack(self._request, self._stack):
+                response = await self._view_fn(
+                    self._request, *self._args, **self._kwargs
+                )
+            self._response = response
+        return self._response
+
+    def __str__(self) -> SafeString:
+        if self._response is None:
+            # a streaming view renders the fragment while the response is sent
+            placeholder = defer_fragment(self._request, self)
+            if placeholder is not None:
+                return placeholder
+        return response_to_str(self.render())
+
+    def __html__(self) -> SafeString:
+        return str(self)
+
+    def __bool__(self) -> bool:
+        # testing a fragment, e.g. with {% if %}, must not render it
+        return True
+
+    def __repr__(self) -> str:
+        state = "rendered" if self.rendered else "pending"
+        return f"<Fragment {self._view_fn.__qualname__} {state}>"
+
+
+def lazy(
+    view_fn: Callable[..., Any], request: HttpRequest, *args, **kwargs
+) -> Fragment:
+    """
+    Returns a fragment that calls `view_fn(request, *args, **kwargs)` when it is
+    output, instead of calling the view immediately:
+
+        return render(request, "page.html", {
+            "details": lazy(details_element, request, source="page"),
+        })
+
+    Nested views that consume request parameters consume them when the
+    fragment is rendered, i.e. in the order the template outputs them.
+    """
+    return Fragment(view_fn, request, *args, **kwargs)
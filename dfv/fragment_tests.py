@@ -0,0 +1,86 @@
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory
+
+from dfv import element, view
+from dfv.fragment import lazy
+from dfv.view_stack import get_view_fn_call_stack_from_request
+
+
+def test_lazy_fragment_renders_when_output(rf: RequestFactory):
+    calls = []
+
+    @view()
+    def root(request):
+        fragment = lazy(child, request, "a")
+        assert calls == []
+        return HttpResponse(str(fragment) + str(fragment))
+
+    @element()
+    def child(request, name: str):
+        calls.append(name)
+        assert len(get_view_fn_call_stack_from_request(request)) == 2
+        return HttpResponse(name)
+
+    response = root(rf.get("/"))
+    assert calls == ["a"]
+    assert response.content == (
+        b"<div id='child' hx-target='this' hx-swap='outerHTML' >a</div>" * 2
+    )
+
+
+def test_lazy_fragment_skipped_in_template(rf: RequestFactory):
+    calls = []
+
+    @view()
+    def root(request):
+        template = Template(
+            "{% if show %}{{ a }}{% endif %}{% if a %}{{ b }}{% endif %}"
+        )
+        return HttpResponse(
+            template.render(
+                Context(
+                    {
+                        "show": False,
+                        "a": lazy(child, request, "a"),
+                        "b": lazy(child, request, "<b>"),
+                    }
+                )
+            )
+        )
+
+    @view()
+    def child(_request, name: str):
+        calls.append(name)
+        return HttpResponse(name)
+
+    response = root(rf.get("/"))
+    assert calls == ["<b>"]
+    assert response.content == b"<b>"
+
+
+def test_lazy_fragment_async_view(rf: RequestFactory):
+    @view()
+    def root(request):
+        return HttpResponse(str(lazy(child, request)))
+
+    @view()
+    async def child(_request):
+        return HttpResponse("async")
+
+    response = root(rf.get("/"))
+    assert response.content == b"async"
+
+
+def test_lazy_fragment_in_async_view(rf: RequestFactory):
+    @view()
+    async def root(request):
+        return HttpResponse(str(lazy(child, request)))
+
+    @view()
+    def child(_request):
+        return HttpResponse("sync")
+
+    response = async_to_sync(root)(rf.get("/"))
+    assert response.content == b"sync"
@@ -0,0 +1,171 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, cast, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpRequest, HttpResponse
+
+from dfv.view_stack import (
+    fork_view_fn_call_stack,
+    get_view_fn_call_stack_from_request,
+)
+
+RENDER_CALL = Callable[[], HttpResponse | Awaitable[HttpResponse]]
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_worker_state = threading.local()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "DFV_GATHER_MAX_WORKERS", 8),
+                thread_name_prefix="dfv-gather",
+            )
+        return _executor
+
+
+def _is_async_call(call: Callable) -> bool:
+    return inspect.iscoroutinefunction(call) or (
+        isinstance(call, functools.partial) and _is_async_call(call.func)
+    )
+
+
+def _render_in_worker(
+    request: HttpRequest, call: RENDER_CALL, stack: Optional[list[Callable]]
+) -> Any:
+    _worker_state.active = True
+    # database connections are per thread, like Django does for requests, keep
+    # them open between tasks until they are unusable or exceed CONN_MAX_AGE
+    close_old_connections()
+    try:
+        with fork_view_fn_call_stack(request, stack):
+            return call()
+    finally:
+        _worker_state.active = False
+        close_old_connections()
+
+
+def _create_worker_task(
+    request: HttpRequest, call: RENDER_CALL, stack: Optional[list[Callable]] = None
+) -> Callable[[], Any]:
+    # run with a copy of the caller's context variables
+    context = contextvars.copy_context()
+    return lambda: context.run(_render_in_worker, request, call, stack)
+
+
+def _bind_call(call: RENDER_CALL) -> RENDER_CALL:
+    # injects the args of a functools.partial() call of a view in the caller's
+    # thread, since consuming request params is not thread-safe
+    if not isinstance(call, functools.partial):
+        return call
+    bind_args = getattr(call.func, "__dfv_bind_args__", None)
+    if bind_args is None:
+        return call
+
+    kwargs = dict(call.keywords)
+    replace_response = bind_args(call.args, kwargs)
+    if replace_response is not None:
+        return lambda: replace_response
+    return functools.partial(call.func, *call.args, **kwargs)
+
+
+async def _abind_call(call: RENDER_CALL) -> RENDER_CALL:
+    if not _is_async_call(call):
+        # binding may load model instances
+        return await sync_to_async(_bind_call)(call)
+    if not isinstance(call, functools.partial):
+        return call
+    bind_args = getattr(call.func, "__dfv_bind_args__", None)
+    if bind_args is None:
+        return call
+
+    kwargs = dict(call.keywords)
+    replace_response = await bind_args(call.args, kwargs)
+    if replace_response is not None:
+
+        async def replaced():
+            return replace_response
+
+        return replaced
+    return functools.partial(call.func, *call.args, **kwargs)
+
+
+def render_concurrently(request: HttpRequest, *calls: RENDER_CALL) -> list[Any]:
+    """
+    Renders independent views, usually sibling elements, in a bounded thread
+    pool and returns their responses in the order of the calls. Each call must
+    be a callable without arguments, e.g. functools.partial(element, request).
+
+    Every call runs with its own copy of the view fn call stack. All calls share
+    the request. If a call is a functools.partial() of a view, the view's
+    injected params are consumed and loaded in the caller's thread, in the
+    order of the calls. Consuming params is not thread-safe, so views that
+    the calls render in turn, e.g. nested elements, must use
+    `param(consume=False)`. Inside a worker thread, calls are rendered sequentially to avoid
+    exhausting the pool with waiting parents.
+
+    Worker threads use their own database connections, outside of the
+    request's transaction, e.g. with ATOMIC_REQUESTS. Concurrently rendered
+    views must not depend on it: they do not see its uncommitted writes, may
+    read a different snapshot and, on SQLite, may wait for its locks. Set
+    CONN_MAX_AGE to keep the connections of the pool open between requests.
+    """
+    if len(calls) <= 1 or getattr(_worker_state, "active", False):
+        return [call() for call in calls]
+
+    calls = tuple(_bind_call(call) for call in calls)
+    executor = _get_executor()
+    futures = [executor.submit(_create_worker_task(request, call)) for call in calls]
+    return [f.result() for f in futures]
+
+
+async def arender_concurrently(request: HttpRequest, *calls: RENDER_CALL) -> list[Any]:
+    """
+    Async variant of render_concurrently(). Async views are awaited concurrently
+    on the event loop, sync views are rendered in the bounded thread pool.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def render_async(call: Callable[[], Awaitable[HttpResponse]]):
+        with fork_view_fn_call_stack(request):
+            return await call()
+
+    def render(call: RENDER_CALL) -> Awaitable[Any]:
+        if _is_async_call(call):
+            return render_async(cast(Callable[[], Awaitable[HttpResponse]], call))
+        return loop.run_in_executor(_get_executor(), _create_worker_task(request, call))
+
+    calls = tuple([await _abind_call(call) for call in calls])
+    return list(await asyncio.gather(*[render(call) for call in calls]))
+
+
+def render_in_background(
+    request: HttpRequest, call: RENDER_CALL
+) -> "Future[Any] | asyncio.Future[Any]":
+    """
+    Starts rendering a view without waiting for it and returns a future of its
+    response. Async views run as a task on the running event loop, sync views
+    in the bounded thread pool. The view runs with a copy of the current view
+    fn call stack, since the caller may return before the view starts. Like
+    with render_concurrently(), sync views do not run in the request's
+    transaction.
+    """
+    stack = list(get_view_fn_call_stack_from_request(request))
+    if _is_async_call(call):
+
+        async def render_async():
+            with fork_view_fn_call_stack(request, stack):
+                return await cast(Callable[[], Awaitable[HttpResponse]], call)()
+
+        return asyncio.ensure_future(render_async())
+    return _get_executor().submit(_create_worker_task(request, call, stack))
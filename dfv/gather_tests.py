@@ -0,0 +1,148 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from dfv import element, gather, param, view
+from dfv.gather import arender_concurrently, render_concurrently
+from dfv.utils import response_to_str
+from dfv.view_stack import get_view_fn_call_stack_from_request
+from main.models import AppUser
+
+
+def test_render_concurrently(rf: RequestFactory):
+    barrier = threading.Barrier(2, timeout=5)
+
+    @view()
+    def root(request):
+        a, b = render_concurrently(
+            request,
+            functools.partial(child, request, "a"),
+            functools.partial(child, request, "b"),
+        )
+        assert len(get_view_fn_call_stack_from_request(request)) == 1
+        return HttpResponse(str(a) + str(b))
+
+    @element()
+    def child(request, name: str):
+        # both children must run at the same time to pass the barrier
+        barrier.wait()
+        assert len(get_view_fn_call_stack_from_request(request)) == 2
+        return HttpResponse(name)
+
+    response = root(rf.get("/"))
+    assert response_to_str(response) == (
+        "<div id='child' hx-target='this' hx-swap='outerHTML' >a</div>"
+        "<div id='child' hx-target='this' hx-swap='outerHTML' >b</div>"
+    )
+
+
+def test_arender_concurrently(rf: RequestFactory):
+    barrier = threading.Barrier(2, timeout=5)
+
+    @view()
+    async def root(request):
+        responses = await arender_concurrently(
+            request,
+            functools.partial(async_child, request, "a"),
+            functools.partial(sync_child, request, "b"),
+        )
+        return HttpResponse("".join(str(r) for r in responses))
+
+    @view()
+    async def async_child(request, name: str):
+        # give the sync child the chance to reach the barrier first
+        await asyncio.sleep(0.01)
+        await asyncio.get_running_loop().run_in_executor(None, barrier.wait)
+        assert len(get_view_fn_call_stack_from_request(request)) == 2
+        return HttpResponse(name)
+
+    @view()
+    def sync_child(request, name: str):
+        barrier.wait()
+        assert len(get_view_fn_call_stack_from_request(request)) == 2
+        return HttpResponse(name)
+
+    response = async_to_sync(root)(rf.get("/"))
+    assert str(response) == "ab"
+
+
+def test_render_concurrently_consumes_params_in_call_order(rf: RequestFactory):
+    @view()
+    def root(request):
+        responses = render_concurrently(
+            request, *[functools.partial(child, request, i) for i in range(8)]
+        )
+        assert "p" not in request.GET
+        return HttpResponse(",".join(str(r) for r in responses))
+
+    @view()
+    def child(_request, index: int, p: str = param("default")):
+        return HttpResponse(f"{index}={p}")
+
+    assert str(root(rf.get("/?p=a"))) == ",".join(
+        ["0=a"] + [f"{i}=default" for i in range(1, 8)]
+    )
+
+
+def test_arender_concurrently_consumes_params_in_call_order(rf: RequestFactory):
+    @view()
+    async def root(request):
+        responses = await arender_concurrently(
+            request,
+            functools.partial(sync_child, request),
+            functools.partial(async_child, request),
+        )
+        return HttpResponse(",".join(str(r) for r in responses))
+
+    @view()
+    def sync_child(_request, p: str = param("default")):
+        return HttpResponse(p)
+
+    @view()
+    async def async_child(_request, p: str = param("default")):
+        return HttpResponse(p)
+
+    assert str(async_to_sync(root)(rf.get("/?p=a"))) == "a,default"
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    # the threads keep their connections to the in-memory test database
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        monkeypatch.setattr(gather, "_executor", executor)
+        yield executor
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("executor")
+def test_render_concurrently_outside_of_request_transaction(rf: RequestFactory):
+    AppUser.objects.create(username="a")
+    AppUser.objects.create(username="b")
+
+    @view()
+    def root(request):
+        # like ATOMIC_REQUESTS
+        with transaction.atomic():
+            assert connection.in_atomic_block
+            responses = render_concurrently(
+                request,
+                functools.partial(child, request, "a"),
+                functools.partial(child, request, "b"),
+            )
+        return HttpResponse("".join(str(r) for r in responses))
+
+    @element()
+    def child(_request, username: str):
+        assert not connection.in_atomic_block
+        return HttpResponse(str(AppUser.objects.get(username=username).pk))
+
+    for _ in range(2):
+        response_to_str(root(rf.get("/")))
+    assert AppUser.objects.count() == 2
@@ -1,9 +1,19 @@
 import lxml.html
-from django.http import HttpResponse
+from django.http import HttpRequest, HttpResponse
+from django_htmx.middleware import HtmxDetails
 
 from dfv.utils import response_to_str
 
 
+def get_htmx(request: HttpRequest) -> HtmxDetails:
+    """
+    Returns the htmx request headers of the request: request.htmx if the request
+    passed django_htmx's HtmxMiddleware, otherwise they are parsed the same way.
+    """
+    htmx = getattr(request, "htmx", None)
+    return htmx if isinstance(htmx, HtmxDetails) else HtmxDetails(request)
+
+
 def swap_oob(
     response: HttpResponse,
     additional: HttpResponse | list[HttpResponse],
@@ -29,3 +39,22 @@ def swap_oob(
         setattr(response, "_dfv_swap_oob", dfv_swap_oob + [oob_wrapped])
 
     return response
+
+
+def to_swap_oob(response: HttpResponse, hx_swap_oob_method="outerHTML") -> list[bytes]:
+    """
+    Converts the response of an element into a swap-oob fragment that replaces
+    the element on the page, followed by the element's own swap-oob fragments.
+    """
+    main, *others = [
+        e
+        for e in lxml.html.fragments_fromstring(response_to_str(response))
+        if not isinstance(e, str)
+    ]
+    swapped = swap_oob(
+        HttpResponse(), HttpResponse(lxml.html.tostring(main)), hx_swap_oob_method
+    )
+    return [
+        *getattr(swapped, "_dfv_swap_oob"),
+        *(lxml.html.tostring(o) for o in others),
+    ]
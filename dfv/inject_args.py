@@ -19,11 +19,17 @@ from typing import (
 
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
+from django.db.models import Manager, QuerySet
 from django.http import HttpRequest, HttpResponse, QueryDict
 
-from dfv.utils import _get_request_from_args, querydict_key_removed
+from dfv.model_instances import (
+    get_model_instance_resolver,
+    ModelInstanceResolver,
+)
+from dfv.utils import _get_request_from_args, querydict_key_consumed
 
 VIEW_FN = TypeVar("VIEW_FN", bound=Callable[..., HttpResponse])
+CONVERTER = Callable[[list[Any], ModelInstanceResolver], Any]
 
 
 def inject_args(
@@ -38,22 +44,64 @@ def inject_args(
         injected_params = _extract_injected_params(
             fn, parameters, auto_param  # , auto_form
         )
-        arg_names = [p.name for p in parameters]
+        arg_positions = {p.name: i for i, p in enumerate(parameters)}
+        bindings = [
+            (name, ip, arg_positions[name]) for name, ip in injected_params.items()
+        ]
+
+        def lookup_raw_values(args, kwargs, model_instances):
+            return [
+                (name, ip, ip.lookup(args, kwargs, model_instances))
+                for name, ip, position in bindings
+                if name not in kwargs and position >= len(args)
+            ]
+
+        def bind_values(request, kwargs, raw_values, model_instances):
+            for name, ip, raw_value in raw_values:
+                kwargs[name] = ip.get_value(raw_value, model_instances)
+                replace_response = ip.replace_response(request, kwargs[name])
+                if replace_response is not None:
+                    return replace_response
+            return None
+
+        def bind_args(args, kwargs) -> Optional[HttpResponse]:
+            request = _get_request_from_args(cast(Any, args))
+            model_instances = get_model_instance_resolver(request)
+            raw_values = lookup_raw_values(args, kwargs, model_instances)
+            return bind_values(request, kwargs, raw_values, model_instances)
+
+        async def abind_args(args, kwargs) -> Optional[HttpResponse]:
+            request = _get_request_from_args(cast(Any, args))
+            model_instances = get_model_instance_resolver(request)
+            raw_values = lookup_raw_values(args, kwargs, model_instances)
+            # load the model instances with async queries, binding the values
+            # then only hits the identity map
+            await model_instances.aload_pending()
+            return bind_values(request, kwargs, raw_values, model_instances)
 
         @functools.wraps(fn)
         def inner(*args, **kwargs) -> HttpResponse:
-            supplied_args = arg_names[: len(args)]
-            for name, ip in injected_params.items():
-                if name not in kwargs and name not in supplied_args:
-                    kwargs[name] = ip.get_value(args, kwargs)
-                    replace_response = ip.replace_response(
-                        _get_request_from_args(cast(Any, args)), kwargs[name]
-                    )
-                    if replace_response is not None:
-                        return replace_response
+            replace_response = bind_args(args, kwargs)
+            if replace_response is not None:
+                return replace_response
 
             return fn(*args, **kwargs)
 
+        @functools.wraps(fn)
+        async def async_inner(*args, **kwargs) -> HttpResponse:
+            replace_response = await abind_args(args, kwargs)
+            if replace_response is not None:
+                return replace_response
+
+            return await fn(*args, **kwargs)
+
+        # lets callers inject the args ahead of the call, e.g. before the call
+        # is handed to another thread. The call then only injects the args that
+        # are not in kwargs yet.
+        if inspect.iscoroutinefunction(fn):
+            setattr(async_inner, "__dfv_bind_args__", abind_args)
+            return cast(VIEW_FN, async_inner)
+        setattr(inner, "__dfv_bind_args__", bind_args)
         return cast(VIEW_FN, inner)
 
     return decorator
@@ -72,7 +120,20 @@ class InjectedParam:
     def check(self):
         pass
 
-    def get_value(self, args: Any, kwargs: dict[str, Any]) -> Any:
+    def lookup(
+        self,
+        args: Any,
+        kwargs: dict[str, Any],
+        model_instances: ModelInstanceResolver,
+    ) -> Any:
+        """
+        Returns the raw value for this param. lookup() is called for all params
+        of a view call before get_value() is called for any of them, so that
+        model instances can be prefetched in bulk.
+        """
+        pass
+
+    def get_value(self, raw_value: Any, model_instances: ModelInstanceResolver) -> Any:
         pass
 
     def replace_response(
@@ -168,48 +229,123 @@ def _extract_injected_params(
 ################################################################################
 
 
+def _querydict_to_dict(qd: QueryDict) -> dict[str, list[Any]]:
+    return {name: qd.getlist(name) for name in qd}
+
+
+class RequestParams:
+    """
+    The GET, POST and form-urlencoded body parameters of a request. They are
+    parsed once per request and shared by all injected parameters of all views
+    rendered for the request. Consumed parameters are removed from the lookup.
+    """
+
+    def __init__(self, request: HttpRequest):
+        self.get_querydict = request.GET
+        self.post_querydict = request.POST
+        self.get = _querydict_to_dict(cast(QueryDict, request.GET))
+        self.post = _querydict_to_dict(cast(QueryDict, request.POST))
+        self.body: dict[str, list[Any]] = {}
+        if request.content_type == "application/x-www-form-urlencoded":
+            if request.method == "POST":
+                # request.POST already is the parsed body
+                self.body = self.post
+            else:
+                self.body = _querydict_to_dict(
+                    QueryDict(request.body, encoding=request.encoding)
+                )
+
+    def is_valid_for(self, request: HttpRequest) -> bool:
+        return self.get_querydict is request.GET and self.post_querydict is request.POST
+
+    def lookup(self, name: str) -> Optional[list[Any]]:
+        """
+        Returns the values for the given parameter name. Body parameters take
+        precedence over GET parameters, GET parameters over POST parameters.
+        """
+        values = self.body.get(name)
+        if values is None:
+            values = self.get.get(name)
+        if values is None:
+            values = self.post.get(name)
+        return values
+
+    def consume_get(self, request: HttpRequest, name: str):
+        request.GET = querydict_key_consumed(cast(Any, request.GET), name)
+        self.get_querydict = request.GET
+        self.get.pop(name, None)
+        self.body.pop(name, None)
+
+    def consume_post(self, request: HttpRequest, name: str):
+        request.POST = querydict_key_consumed(cast(Any, request.POST), name)
+        self.post_querydict = request.POST
+        self.post.pop(name, None)
+        self.body.pop(name, None)
+
+
+def get_request_params(request: HttpRequest) -> RequestParams:
+    params: Optional[RequestParams] = getattr(request, "__dfv_request_params", None)
+    if params is None or not params.is_valid_for(request):
+        # first access or request.GET/request.POST were replaced by someone else
+        params = RequestParams(request)
+        setattr(request, "__dfv_request_params", params)
+    return params
+
+
 @dataclasses.dataclass
 class InjectedParamQuery(InjectedParam):
     query_param_name: Optional[str] = dataclasses.field(default=None)
     default: Any = dataclasses.field(default=None)
     consume: bool = dataclasses.field(default=True)
+    fresh: bool = dataclasses.field(default=False)
+    queryset: Optional[QuerySet | Manager] = dataclasses.field(default=None)
+    converter: CONVERTER = dataclasses.field(init=False)
+    optional: bool = dataclasses.field(init=False)
+    model_type: Optional[Type[models.Model]] = dataclasses.field(init=False)
 
     def check(self):
         if self.query_param_name is None:
             self.query_param_name = self.name
-
-    def _create_lookup_dict(self, request: HttpRequest):
-        getqd = cast(QueryDict, request.GET)
-        getd = {name: getqd.getlist(name) for name in getqd}
-        postqd = cast(QueryDict, request.POST)
-        postd = {name: postqd.getlist(name) for name in postqd}
-
-        formqd = QueryDict(mutable=True)
-        if request.content_type == "application/x-www-form-urlencoded":
-            formqd.update(
-                QueryDict(request.body, mutable=True, encoding=request.encoding)
+        self.optional = _is_optional_type(self.target_type)
+        self.model_type = _find_model_type(self.target_type)
+        if isinstance(self.queryset, Manager):
+            self.queryset = self.queryset.all()
+        if self.queryset is not None and (
+            self.model_type is None
+            or not issubclass(self.queryset.model, self.model_type)
+        ):
+            raise Exception(
+                f"The queryset of parameter '{self.name}' must return instances of "
+                f"the parameter's model type, got {self.queryset.model}."
             )
-        return postd | getd | formqd
+        self.converter = _create_converter(self.target_type, self.queryset)
 
-    def _consume_param(self, request: HttpRequest):
-        if self.query_param_name in request.GET:
-            request.GET = querydict_key_removed(
-                cast(Any, request.GET), self.query_param_name
-            )
-        elif self.query_param_name in request.POST:
-            request.POST = querydict_key_removed(
-                cast(Any, request.POST), self.query_param_name
-            )
+    def _lookup_values(self, params: RequestParams) -> Optional[list[Any]]:
+        return params.lookup(cast(str, self.query_param_name))
 
-    def get_value(self, args: Any, kwargs: dict[str, Any]):
+    def _consume_param(self, request: HttpRequest, params: RequestParams):
+        name = cast(str, self.query_param_name)
+        if name in params.get:
+            params.consume_get(request, name)
+        elif name in params.post:
+            params.consume_post(request, name)
+        else:
+            params.body.pop(name, None)
+
+    def lookup(
+        self,
+        args: Any,
+        kwargs: dict[str, Any],
+        model_instances: ModelInstanceResolver,
+    ) -> Optional[list[Any]]:
         request = _get_request_from_args(args)
-        lookup_dict = self._create_lookup_dict(request)
-        values = lookup_dict.get(self.query_param_name, None)
+        params = get_request_params(request)
+        values = self._lookup_values(params)
 
         if values is None:
             if self.default is not None:
                 values = [self.default]
-            elif issubclass(NoneType, self.target_type):
+            elif self.optional:
                 return None
             else:
                 raise Exception(
@@ -217,50 +353,72 @@ class InjectedParamQuery(InjectedParam):
                 )
 
         if self.consume:
-            self._consume_param(request)
+            self._consume_param(request, params)
+
+        if self.model_type is not None:
+            model_instances.prefetch(
+                self.model_type, values, fresh=self.fresh, queryset=self.queryset
+            )
 
-        return _convert_value_to_type(values, self.target_type)
+        return values
+
+    def get_value(
+        self, raw_value: Optional[list[Any]], model_instances: ModelInstanceResolver
+    ) -> Any:
+        if raw_value is None:
+            return None
+        return self.converter(raw_value, model_instances)
 
 
 @dataclasses.dataclass
 class InjectedParamQueryGet(InjectedParamQuery):
-    def _create_lookup_dict(self, request: HttpRequest):
-        qd = cast(QueryDict, request.GET)
-        return {name: qd.getlist(name) for name in qd}
-
-    def _consume_param(self, request: HttpRequest):
-        if self.query_param_name in request.GET:
-            request.GET = querydict_key_removed(
-                cast(Any, request.GET), self.query_param_name
-            )
+    def _lookup_values(self, params: RequestParams) -> Optional[list[Any]]:
+        return params.get.get(cast(str, self.query_param_name))
+
+    def _consume_param(self, request: HttpRequest, params: RequestParams):
+        name = cast(str, self.query_param_name)
+        if name in params.get:
+            params.consume_get(request, name)
 
 
 @dataclasses.dataclass
 class InjectedParamQueryPost(InjectedParamQuery):
-    def _create_lookup_dict(self, request: HttpRequest):
-        qd = cast(QueryDict, request.POST)
-        return {name: qd.getlist(name) for name in qd}
-
-    def _consume_param(self, request: HttpRequest):
-        if self.query_param_name in request.POST:
-            request.POST = querydict_key_removed(
-                cast(Any, request.POST), self.query_param_name
-            )
+    def _lookup_values(self, params: RequestParams) -> Optional[list[Any]]:
+        return params.post.get(cast(str, self.query_param_name))
+
+    def _consume_param(self, request: HttpRequest, params: RequestParams):
+        name = cast(str, self.query_param_name)
+        if name in params.post:
+            params.consume_post(request, name)
 
 
-def param_get(default=None, consume=True) -> Any:
-    return InjectedParamQueryGet(default=default, consume=consume)
+def param_get(default=None, consume=True, fresh=False, queryset=None) -> Any:
+    return InjectedParamQueryGet(
+        default=default, consume=consume, fresh=fresh, queryset=queryset
+    )
 
 
-def param_post(default=None, consume=True) -> Any:
-    return InjectedParamQueryPost(default=default, consume=consume)
+def param_post(default=None, consume=True, fresh=False, queryset=None) -> Any:
+    return InjectedParamQueryPost(
+        default=default, consume=consume, fresh=fresh, queryset=queryset
+    )
 
 
 T = TypeVar("T")
 
 
-def param(default: T = cast(Any, None), consume=True) -> T:
-    return cast(T, InjectedParamQuery(default=default, consume=consume))
+def param(
+    default: T = cast(Any, None),
+    consume=True,
+    fresh=False,
+    queryset: Optional[QuerySet | Manager] = None,
+) -> T:
+    return cast(
+        T,
+        InjectedParamQuery(
+            default=default, consume=consume, fresh=fresh, queryset=queryset
+        ),
+    )
 
 
 def check_and_return_model_type(target_type: Any) -> Type[models.Model] | None:
@@ -284,46 +442,124 @@ class ObjectDoesNotExistWithPk(ObjectDoesNotExist):
         self.pk = pk
 
 
-def _convert_value_to_type(values: list[Any], target_type: type):
-    # List type
-    if get_origin(target_type) == list:
-        list_type = get_args(target_type)[0]
-        return [_convert_value_to_type([v], list_type) for v in values]
+def _parse_bool(value: Any) -> bool:
+    return False if value in (False, "", "false", "False") else True
 
-    if target_type == list:
-        return [_convert_value_to_type([v], str) for v in values]
 
-    # Scalar types
-    value = values[0]
+def _find_scalar_parser(target_type: Any) -> Optional[Callable[[Any], Any]]:
+    if issubclass(str, target_type):
+        return str
+    if issubclass(int, target_type):
+        return int
+    if issubclass(float, target_type):
+        return float
+    if issubclass(bool, target_type):
+        return _parse_bool
+    if issubclass(uuid.UUID, target_type):
+        return uuid.UUID
 
-    try:
+    return None
+
+
+def _unsupported_type_error(target_type: Any, value: Any) -> ValueError:
+    return ValueError(f"Unsupported type: {target_type} for value: {value}")
+
+
+def _create_model_converter(
+    model_type: Type[models.Model], target_type: Any, queryset: Optional[QuerySet]
+) -> CONVERTER:
+    raise_with_pk = issubclass(ObjectDoesNotExistWithPk, target_type)
+
+    def convert(values: list[Any], model_instances: ModelInstanceResolver) -> Any:
+        value = values[0]
         if value is None:
-            pass  # trigger ValueError
-        elif model_type := check_and_return_model_type(target_type):
+            raise _unsupported_type_error(target_type, value)
+
+        try:
             try:
-                return model_type.objects.get(pk=value)
+                return model_instances.get(model_type, value, queryset=queryset)
             except model_type.DoesNotExist as e:
-                if issubclass(ObjectDoesNotExistWithPk, target_type):
+                if raise_with_pk:
                     raise ObjectDoesNotExistWithPk(value)
                 raise e
-        elif isinstance(value, target_type):
-            return value  # nothing to do
-        elif issubclass(str, target_type):
-            return str(value)
-        elif issubclass(int, target_type):
-            return int(value)
-        elif issubclass(float, target_type):
-            return float(value)
-        elif issubclass(bool, target_type):
-            return False if value in (False, "", "false", "False") else True
-        elif issubclass(uuid.UUID, target_type):
-            return uuid.UUID(value)
-    except Exception as error:
-        if isinstance(error, target_type):
-            return error
-        raise error
-
-    raise ValueError(f"Unsupported type: {target_type} for value: {value}")
+        except Exception as error:
+            if isinstance(error, target_type):
+                return error
+            raise error
+
+    return convert
+
+
+def _create_scalar_converter(target_type: Any) -> CONVERTER:
+    parser = _find_scalar_parser(target_type)
+
+    def convert(values: list[Any], _model_instances: ModelInstanceResolver) -> Any:
+        value = values[0]
+        if value is None:
+            raise _unsupported_type_error(target_type, value)
+
+        try:
+            if isinstance(value, target_type):
+                return value  # nothing to do
+            if parser is not None:
+                return parser(value)
+        except Exception as error:
+            if isinstance(error, target_type):
+                return error
+            raise error
+
+        raise _unsupported_type_error(target_type, value)
+
+    return convert
+
+
+def _create_converter(
+    target_type: Any, queryset: Optional[QuerySet] = None
+) -> CONVERTER:
+    """
+    Resolves the conversion of request values to the given target type once, so
+    that the request path only runs the returned, precomputed callable. Model
+    instances are loaded from the given queryset, if any.
+    """
+    # List type
+    if get_origin(target_type) == list:
+        list_item_converter = _create_converter(get_args(target_type)[0], queryset)
+        return lambda values, mi: [list_item_converter([v], mi) for v in values]
+
+    if target_type == list:
+        str_converter = _create_converter(str)
+        return lambda values, mi: [str_converter([v], mi) for v in values]
+
+    # Scalar types
+    try:
+        if model_type := check_and_return_model_type(target_type):
+            return _create_model_converter(model_type, target_type, queryset)
+        return _create_scalar_converter(target_type)
+    except TypeError:
+
+        def convert_unsupported(values: list[Any], _mi: ModelInstanceResolver) -> Any:
+            raise _unsupported_type_error(target_type, values[0])
+
+        return convert_unsupported
+
+
+def _find_model_type(target_type: Any) -> Optional[Type[models.Model]]:
+    """
+    Returns the model class of model-typed and list-of-model-typed params.
+    """
+    if get_origin(target_type) == list:
+        target_type = get_args(target_type)[0]
+    try:
+        return check_and_return_model_type(target_type)
+    except TypeError:
+        return None
+
+
+def _is_optional_type(target_type: Any) -> bool:
+    try:
+        return issubclass(NoneType, target_type)
+    except TypeError:
+        return False
 
 
 # @dataclasses.dataclass
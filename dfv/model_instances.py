@@ -0,0 +1,128 @@
+from typing import Any, Iterable, Optional, Type
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import QuerySet
+from django.http import HttpRequest
+
+
+def _to_pk(model_type: Type[models.Model], value: Any) -> Any:
+    return model_type._meta.pk.to_python(value)  # noqa: SLF001
+
+
+def _does_not_exist(model_type: Type[models.Model]) -> Exception:
+    object_name = model_type._meta.object_name  # noqa: SLF001
+    return model_type.DoesNotExist(f"{object_name} matching query does not exist.")
+
+
+def _manager(model_type: Type[models.Model], queryset: Optional[QuerySet]) -> Any:
+    return queryset if queryset is not None else model_type.objects
+
+
+# Instances are loaded either with the model's `objects` manager (None) or with
+# a queryset that shapes the loaded data, e.g. with select_related().
+_SOURCE = tuple[Type[models.Model], Optional[QuerySet]]
+
+
+class ModelInstanceResolver:
+    """
+    Resolves model instances by primary key. Primary keys announced with
+    prefetch() are loaded with a single in_bulk() query per model class the
+    first time an instance of that class is requested.
+
+    Resolved instances are kept in an identity map, so every lookup of the same
+    (model, pk) returns the same instance without hitting the database again.
+    Instances loaded with a custom queryset are kept separately per queryset,
+    so they are never mixed up with instances lacking the queryset's shaping.
+    """
+
+    def __init__(self):
+        self._pending: dict[_SOURCE, set[Any]] = {}
+        self._instances: dict[tuple[_SOURCE, Any], models.Model] = {}
+        self._missing: set[tuple[_SOURCE, Any]] = set()
+
+    def prefetch(
+        self,
+        model_type: Type[models.Model],
+        values: Iterable[Any],
+        fresh=False,
+        queryset: Optional[QuerySet] = None,
+    ):
+        """
+        Announces primary keys that will be requested with get(). With
+        fresh=True, already resolved instances are loaded again.
+        """
+        source = (model_type, queryset)
+        pending = self._pending.setdefault(source, set())
+        for value in values:
+            try:
+                pk = _to_pk(model_type, value)
+            except ValidationError:
+                continue  # get() will raise the appropriate error
+            key = (source, pk)
+            if fresh:
+                self._instances.pop(key, None)
+                self._missing.discard(key)
+            if key not in self._instances and key not in self._missing:
+                pending.add(pk)
+
+    def _load_pending(self, source: _SOURCE):
+        pks = self._pending.pop(source, None)
+        if not pks:
+            return
+
+        instances = _manager(*source).in_bulk(pks)
+        self._store_loaded(source, pks, instances)
+
+    def _store_loaded(
+        self, source: _SOURCE, pks: set[Any], instances: dict[Any, models.Model]
+    ):
+        for pk in pks:
+            if pk in instances:
+                self._instances[(source, pk)] = instances[pk]
+            else:
+                self._missing.add((source, pk))
+
+    async def aload_pending(self):
+        """
+        Loads all announced primary keys with async queries.
+        """
+        for source in list(self._pending):
+            pks = self._pending.pop(source, None)
+            if not pks:
+                continue
+
+            instances = await _manager(*source).ain_bulk(pks)
+            self._store_loaded(source, pks, instances)
+
+    def get(
+        self,
+        model_type: Type[models.Model],
+        value: Any,
+        queryset: Optional[QuerySet] = None,
+    ) -> models.Model:
+        source = (model_type, queryset)
+        manager = _manager(model_type, queryset)
+        try:
+            key = (source, _to_pk(model_type, value))
+        except ValidationError:
+            # let the database lookup raise the same error as a direct query
+            return manager.get(pk=value)
+
+        self._load_pending(source)
+        if key in self._instances:
+            return self._instances[key]
+        if key in self._missing:
+            raise _does_not_exist(model_type)
+
+        instance = manager.get(pk=value)
+        self._instances[key] = instance
+        return instance
+
+
+def get_model_instance_resolver(request: HttpRequest) -> ModelInstanceResolver:
+    resolver = getattr(request, "__dfv_model_instances", None)
+    if resolver is None:
+        resolver = ModelInstanceResolver()
+        setattr(request, "__dfv_model_instances", resolver)
+    return resolver
@@ -0,0 +1,139 @@
+import functools
+import inspect
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, cast, Optional
+
+from django.http import HttpRequest, HttpResponse
+
+from dfv.htmx import get_htmx
+from dfv.route import reverse_view
+from dfv.utils import _encode_params, _get_request_from_args
+from dfv.view_stack import is_view_fn_request_target
+
+POLL_VERSION_HEADER = "DFV-Poll-Version"
+
+# htmx stops polling when it receives this status code
+HTMX_STOP_POLLING = 286
+
+
+@dataclass(frozen=True)
+class PollPolicy:
+    """
+    Lets an element poll itself with `hx-trigger="every ..."`.
+
+    `version` is called with the arguments of the view fn and returns a cheap
+    version token of the element's data, e.g. a counter or a timestamp. The
+    element sends the token with every poll (hx-headers). If it did not
+    change, the poll is answered with 204 No Content without calling the view
+    fn, so htmx does not swap anything.
+
+    If `stop` returns True, the element is rendered a last time with status 286,
+    which makes htmx stop polling.
+
+    `url` is the URL to poll, by default the current URL if the element is the
+    request target, otherwise the URL of the element's route with the
+    arguments of the element call as query parameters.
+
+    Polling elements should not use a CachePolicy, since a cached response
+    carries the version token of the render that was stored.
+    """
+
+    version: Callable[..., Any]
+    every: str = "2s"
+    stop: Optional[Callable[..., Any]] = None
+    url: Optional[str | Callable[[HttpRequest], str]] = None
+
+
+async def _maybe_await(value: Any) -> Any:
+    return await value if inspect.isawaitable(value) else value
+
+
+def _is_poll_request(request: HttpRequest, element_id: str) -> bool:
+    htmx = get_htmx(request)
+    return (
+        bool(htmx)
+        and htmx.trigger == element_id
+        and POLL_VERSION_HEADER in request.headers
+    )
+
+
+def _not_changed(request: HttpRequest, element_id: str, version: str) -> bool:
+    return (
+        _is_poll_request(request, element_id)
+        and request.headers.get(POLL_VERSION_HEADER) == version
+    )
+
+
+def poll_view_fn(
+    fn: Callable,
+    policy: PollPolicy,
+    element_id: str,
+    element_fn: Callable[[], Callable],
+) -> Callable:
+    """
+    Wraps the view fn of a polling element. `element_fn` returns the decorated
+    element, whose route is polled by default.
+    """
+
+    signature = inspect.signature(fn)
+
+    def poll_url(request: HttpRequest, args, kwargs) -> str:
+        if isinstance(policy.url, str):
+            return policy.url
+        if policy.url is not None:
+            return policy.url(request)
+        if is_view_fn_request_target(request):
+            return request.get_full_path()
+        arguments = signature.bind_partial(*args, **kwargs).arguments
+        params = {
+            name: value
+            for name, value in list(arguments.items())[1:]
+            if value is not None
+        }
+        url = reverse_view(element_fn())
+        query = _encode_params(params)
+        return f"{url}?{query}" if query else url
+
+    def mark(response: Any, version: str, stop: bool, args, kwargs):
+        if not isinstance(response, HttpResponse):
+            return response
+        if stop:
+            response.status_code = HTMX_STOP_POLLING
+        else:
+            request = _get_request_from_args(args)
+            attrs = {
+                "hx-get": poll_url(request, args, kwargs),
+                "hx-trigger": f"every {policy.every}",
+                "hx-headers": json.dumps({POLL_VERSION_HEADER: version}),
+            }
+            setattr(response, "_dfv_poll_attrs", attrs)
+        return response
+
+    @functools.wraps(fn)
+    def inner(*args, **kwargs):
+        request = _get_request_from_args(cast(Any, args))
+        stop = policy.stop is not None and bool(policy.stop(*args, **kwargs))
+        version = str(policy.version(*args, **kwargs))
+        if not stop and _not_changed(request, element_id, version):
+            return HttpResponse(status=204)
+        return mark(fn(*args, **kwargs), version, stop, args, kwargs)
+
+    @functools.wraps(fn)
+    async def async_inner(*args, **kwargs):
+        request = _get_request_from_args(cast(Any, args))
+        stop = policy.stop is not None and bool(
+            await _maybe_await(policy.stop(*args, **kwargs))
+        )
+        version = str(await _maybe_await(policy.version(*args, **kwargs)))
+        if not stop and _not_changed(request, element_id, version):
+            return HttpResponse(status=204)
+        return mark(await fn(*args, **kwargs), version, stop, args, kwargs)
+
+    return async_inner if inspect.iscoroutinefunction(fn) else inner
+
+
+def pop_poll_attrs(response: Any) -> dict[str, str]:
+    if not isinstance(response, HttpResponse):
+        return {}
+    return response.__dict__.pop("_dfv_poll_attrs", {})
@@ -0,0 +1,113 @@
+import json
+
+import lxml.html
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from dfv import element, param, PollPolicy, view
+from dfv.poll import POLL_VERSION_HEADER
+from dfv.route import create_path
+from dfv.utils import response_to_str
+
+
+def _poll_request(rf: RequestFactory, url: str, element_id: str, version: str):
+    return rf.get(
+        url,
+        HTTP_HX_REQUEST="true",
+        HTTP_HX_TRIGGER=element_id,
+        HTTP_DFV_POLL_VERSION=version,
+    )
+
+
+def test_poll_attributes(rf: RequestFactory):
+    @element(poll=PollPolicy(version=lambda _request, p1: p1 * 2, every="5s"))
+    def status(_request, p1: int = param()):
+        return HttpResponse("status")
+
+    response = status(rf.get("/status?p1=2"))
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(response_to_str(response))
+    assert parsed.attrib["id"] == "status"
+    assert parsed.attrib["hx-get"] == "/status?p1=2"
+    assert parsed.attrib["hx-trigger"] == "every 5s"
+    assert json.loads(parsed.attrib["hx-headers"]) == {POLL_VERSION_HEADER: "4"}
+
+
+def test_poll_unchanged_version_returns_204(rf: RequestFactory):
+    calls = []
+
+    @element(poll=PollPolicy(version=lambda _request: "v1"))
+    def status(_request):
+        calls.append(1)
+        return HttpResponse("status")
+
+    response = status(_poll_request(rf, "/status", "status", "v1"))
+    assert response.status_code == 204
+    assert response.content == b""
+    assert calls == []
+
+    response = status(_poll_request(rf, "/status", "status", "v0"))
+    assert response.status_code == 200
+    assert b"status" in response.content
+    assert calls == [1]
+
+
+def test_poll_version_of_other_element_is_ignored(rf: RequestFactory):
+    @element(poll=PollPolicy(version=lambda _request: "v1"))
+    def status(_request):
+        return HttpResponse("status")
+
+    response = status(_poll_request(rf, "/status", "other", "v1"))
+    assert response.status_code == 200
+
+
+def test_poll_stop_returns_286(rf: RequestFactory):
+    @element(poll=PollPolicy(version=lambda _request: "v1", stop=lambda _request: True))
+    def status(_request):
+        return HttpResponse("done")
+
+    response = status(_poll_request(rf, "/status", "status", "v1"))
+    assert response.status_code == 286
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(response_to_str(response))
+    assert parsed.text == "done"
+    assert "hx-trigger" not in parsed.attrib
+
+
+def test_poll_nested_element_url(rf: RequestFactory):
+    @view()
+    def page(request):
+        return HttpResponse(str(status(request)))
+
+    @element(poll=PollPolicy(version=lambda _request: "v1", url="/poll/status"))
+    def status(_request):
+        return HttpResponse("status")
+
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(
+        response_to_str(page(rf.get("/page")))
+    )
+    assert parsed.attrib["hx-get"] == "/poll/status"
+
+
+@element(poll=PollPolicy(version=lambda _request, item, page: f"{item}.{page}"))
+def polled_item(_request, item: int = param(), page: int = param()):
+    return HttpResponse(f"item {item}")
+
+
+urlpatterns = [create_path(polled_item, "polled_item")]
+
+
+@pytest.mark.urls(__name__)
+def test_poll_nested_element_url_with_params(rf: RequestFactory):
+    @view()
+    def page(request):
+        return HttpResponse(str(polled_item(request, item=5)))
+
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(
+        response_to_str(page(rf.get("/page?page=2")))
+    )
+    assert parsed.attrib["hx-get"] == "/polled_item?item=5&page=2"
+
+    response = polled_item(
+        _poll_request(rf, parsed.attrib["hx-get"], "polled_item", "5.2")
+    )
+    assert response.status_code == 204
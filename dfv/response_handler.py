@@ -1,5 +1,7 @@
-from typing import Callable, Literal, Optional, TypeAlias
+import inspect
+from typing import Awaitable, Callable, Literal, Optional, TypeAlias
 
+from asgiref.sync import async_to_sync
 from django.http import HttpRequest, HttpResponse
 from django_htmx.http import push_url
 
@@ -7,7 +9,9 @@ from dfv.htmx import swap_oob
 from dfv.view_stack import get_view_fn_call_stack_from_request_or_raise
 
 
-RESPONSE_HANDLER: TypeAlias = Callable[[HttpResponse], Optional[HttpResponse]]
+RESPONSE_HANDLER: TypeAlias = Callable[
+    [HttpResponse], Optional[HttpResponse] | Awaitable[Optional[HttpResponse]]
+]
 
 
 def get_response_handlers_from_request(request: HttpRequest) -> list[RESPONSE_HANDLER]:
@@ -22,10 +26,36 @@ def add_response_handler(request: HttpRequest, handler: RESPONSE_HANDLER):
     handlers.append(handler)
 
 
-def process_response(request: HttpRequest, response: HttpResponse) -> HttpResponse:
+async def _await(awaitable: Awaitable[Optional[HttpResponse]]):
+    return await awaitable
+
+
+def process_response(
+    request: HttpRequest,
+    response: HttpResponse,
+    skip=0,
+    stop: Optional[int] = None,
+) -> HttpResponse:
+    handlers = get_response_handlers_from_request(request)
+    for handler in handlers[skip:stop]:
+        result = handler(response)
+        if inspect.isawaitable(result):
+            result = async_to_sync(_await)(result)
+        response = result if result is not None else response
+    return response
+
+
+async def aprocess_response(
+    request: HttpRequest,
+    response: HttpResponse,
+    skip=0,
+    stop: Optional[int] = None,
+) -> HttpResponse:
     handlers = get_response_handlers_from_request(request)
-    for handler in handlers:
+    for handler in handlers[skip:stop]:
         result = handler(response)
+        if inspect.isawaitable(result):
+            result = await result
         response = result if result is not None else response
     return response
 
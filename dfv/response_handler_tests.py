@@ -1,4 +1,5 @@
 import pytest
+from asgiref.sync import async_to_sync
 from django.test import RequestFactory
 from django.http import HttpResponse
 
@@ -46,3 +47,22 @@ def test_process_response_hook_with_nested_elements(rf: RequestFactory):
     assert len(state) == 2
     assert state[0] == 1
     assert state[1] == 2
+
+
+def test_process_response_async_hook(rf: RequestFactory):
+    async def handler(response):
+        response["X-Handler"] = "async"
+
+    @view()
+    def root(request):
+        add_response_handler(request, handler)
+        return HttpResponse("")
+
+    assert root(rf.get("/"))["X-Handler"] == "async"
+
+    @view()
+    async def async_root(request):
+        add_response_handler(request, handler)
+        return HttpResponse("")
+
+    assert async_to_sync(async_root)(rf.get("/"))["X-Handler"] == "async"
@@ -23,10 +23,66 @@ document.body.addEventListener('htmx:configRequest', addCsrfTokenHeader);
 
 document.body.addEventListener("fetch:beforeRequest", addCsrfTokenHeader);
 
+// Refreshes an element with the batch endpoint, see dfv.batch. Refreshes that
+// are requested within a short window are sent with a single request.
+(function () {
+    const batchUrl = document.currentScript.dataset.batchUrl;
+    let pendingUrls = [];
+    let timeout = null;
+
+    function sendBatch() {
+        const params = new URLSearchParams();
+        pendingUrls.forEach(url => params.append("element", url));
+        pendingUrls = [];
+        timeout = null;
+        htmx.ajax("GET", batchUrl + "?" + params, {swap: "none"});
+    }
+
+    /**
+     * @param {string} elementUrl the URL of the element, including its params
+     */
+    window.dfvRefresh = function (elementUrl) {
+        if (!pendingUrls.includes(elementUrl)) {
+            pendingUrls.push(elementUrl);
+        }
+        if (timeout == null) {
+            timeout = setTimeout(sendBatch, 20);
+        }
+    }
+})();
+
+// Elements with a DiffPolicy carry the version the client has, so the server
+// only sends the parts that changed since, see dfv.diff.
+document.body.addEventListener("htmx:configRequest", function (event) {
+    const version = event.detail.target?.getAttribute("dfv-diff-version");
+    if (version) {
+        event.detail.headers["DFV-Diff-Version"] = version;
+    }
+});
+
+document.body.addEventListener("htmx:afterRequest", function (event) {
+    // a response with changes only does not swap the element itself
+    const version = event.detail.xhr?.getResponseHeader("DFV-Diff-Version");
+    const target = event.detail.target;
+    if (version && target?.isConnected) {
+        target.setAttribute("dfv-diff-version", version);
+    }
+});
+
 window.parse_element = function (elementId) {
     return JSON.parse(document.getElementById(elementId).textContent)
 }
 
+// Out-of-order elements of a streamed page replace their placeholders with an
+// inline script. Swap in those whose script did not run, e.g. due to a CSP.
+document.querySelectorAll("body > [hx-swap-oob]").forEach(function (el) {
+    const placeholder = document.getElementById(el.id);
+    if (placeholder != null && placeholder !== el) {
+        el.removeAttribute("hx-swap-oob");
+        placeholder.replaceWith(el);
+    }
+});
+
 /**
  * @param {HTMLElement} el
  */
@@ -0,0 +1,234 @@
+import asyncio
+import concurrent.futures
+import inspect
+import re
+import secrets
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    cast,
+    Iterator,
+    Optional,
+    TYPE_CHECKING,
+)
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.safestring import mark_safe, SafeString
+
+from dfv.gather import _is_async_call, render_in_background, RENDER_CALL
+from dfv.htmx import get_htmx, to_swap_oob
+from dfv.response_handler import (
+    aprocess_response,
+    get_response_handlers_from_request,
+    process_response,
+)
+from dfv.utils import response_to_bytes
+from dfv.view_stack import get_view_fn_call_stack_from_request
+
+if TYPE_CHECKING:
+    from dfv.fragment import Fragment
+
+
+_FUTURE = concurrent.futures.Future | asyncio.Future
+
+# Fills the placeholder of an out-of-order element while the page is still
+# loading. htmx only processes hx-swap-oob in responses to its own requests.
+_SWAP_OOB_SCRIPT = (
+    b"<script>(function(e){var t=document.getElementById(e.id);"
+    b'if(t&&t!==e){e.removeAttribute("hx-swap-oob");t.replaceWith(e)}})'
+    b"(document.currentScript.previousElementSibling)</script>"
+)
+
+
+class StreamState:
+    """
+    The work that a streaming view deferred while rendering. Each deferred
+    fragment is output as a placeholder, which is replaced with the rendered
+    fragment while the response is streamed. Out-of-order elements are
+    rendered in the background and sent at the end of the stream.
+    """
+
+    __slots__ = ("fragments", "elements", "handled", "_token")
+
+    def __init__(self):
+        self.fragments: list["Fragment"] = []
+        self.elements: list[_FUTURE] = []
+        # the number of response handlers that are processed before streaming
+        self.handled = 0
+        # placeholders must not match any content of the page
+        self._token = secrets.token_hex(8)
+
+    def placeholder(self, fragment: "Fragment") -> SafeString:
+        self.fragments.append(fragment)
+        return mark_safe(f"<!--dfv-stream:{self._token}:{len(self.fragments) - 1}-->")
+
+    def split(self, content: bytes) -> list[bytes]:
+        # content and fragment indexes alternate, starting and ending with content
+        return re.split(
+            rb"<!--dfv-stream:" + self._token.encode() + rb":(\d+)-->", content
+        )
+
+
+def defer_fragment(request: HttpRequest, fragment: "Fragment") -> Optional[SafeString]:
+    """
+    Returns a placeholder for a fragment that the root view of a streaming
+    request outputs, or None if the fragment must be rendered in place.
+    """
+    state: Optional[StreamState] = getattr(request, "__dfv_stream", None)
+    if state is None or len(get_view_fn_call_stack_from_request(request)) != 1:
+        return None
+    return state.placeholder(fragment)
+
+
+def render_out_of_order(request: HttpRequest, call: RENDER_CALL) -> bool:
+    """
+    Starts rendering an out-of-order element in the background if the root view
+    of a streaming request calls it. Returns False if the element must be
+    rendered in place.
+    """
+    state: Optional[StreamState] = getattr(request, "__dfv_stream", None)
+    if state is None or len(get_view_fn_call_stack_from_request(request)) != 1:
+        return False
+    if _is_async_call(call) and not isinstance(request, ASGIRequest):
+        # the event loop of an async view does not outlive a WSGI request
+        return False
+    state.elements.append(render_in_background(request, call))
+    return True
+
+
+def render_deferring_fragments(
+    request: HttpRequest, fn: Callable, args, kwargs
+) -> tuple[Any, StreamState]:
+    state = StreamState()
+    setattr(request, "__dfv_stream", state)
+    try:
+        result = fn(*args, **kwargs)
+        if isinstance(result, SimpleTemplateResponse):
+            result.render()
+        state.handled = len(get_response_handlers_from_request(request))
+        return result, state
+    finally:
+        delattr(request, "__dfv_stream")
+
+
+async def arender_deferring_fragments(
+    request: HttpRequest, fn: Callable, args, kwargs
+) -> tuple[Any, StreamState]:
+    state = StreamState()
+    setattr(request, "__dfv_stream", state)
+    try:
+        result = fn(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        if isinstance(result, SimpleTemplateResponse):
+            await sync_to_async(result.render)()
+        state.handled = len(get_response_handlers_from_request(request))
+        return result, state
+    finally:
+        delattr(request, "__dfv_stream")
+
+
+def _tail_to_bytes(tail: HttpResponse) -> bytes:
+    content = response_to_bytes(tail)
+    if not hasattr(tail, "swap_oob_chunks"):
+        # a plain response only carries the swap-oob fragments as a marker
+        content += b"".join(getattr(tail, "_dfv_swap_oob", []))
+    return content
+
+
+def _fill_placeholder(request: HttpRequest, response: Any) -> bytes:
+    if not isinstance(response, HttpResponse) or response.status_code != 200:
+        return b""
+
+    fragments = to_swap_oob(response)
+    if not get_htmx(request):
+        # each script swaps the fragment right before it
+        fragments = [c for f in fragments for c in (f, _SWAP_OOB_SCRIPT)]
+    return b"".join(fragments)
+
+
+def _stream(
+    request: HttpRequest, parts: list[bytes], state: StreamState, skip: int
+) -> Iterator[bytes]:
+    yield parts[0]
+    for i in range(1, len(parts), 2):
+        yield response_to_bytes(state.fragments[int(parts[i])].render())
+        if parts[i + 1]:
+            yield parts[i + 1]
+
+    for future in concurrent.futures.as_completed(
+        cast(list[concurrent.futures.Future], state.elements)
+    ):
+        yield _fill_placeholder(request, future.result())
+
+    if len(get_response_handlers_from_request(request)) > skip:
+        yield _tail_to_bytes(process_response(request, HttpResponse(), skip))
+
+
+async def _astream(
+    request: HttpRequest, parts: list[bytes], state: StreamState, skip: int
+) -> AsyncIterator[bytes]:
+    yield parts[0]
+    for i in range(1, len(parts), 2):
+        yield response_to_bytes(await state.fragments[int(parts[i])].arender())
+        if parts[i + 1]:
+            yield parts[i + 1]
+
+    futures = [asyncio.wrap_future(f) for f in state.elements]
+    for future in asyncio.as_completed(futures):
+        response = await future
+        yield await sync_to_async(_fill_placeholder)(request, response)
+
+    if len(get_response_handlers_from_request(request)) > skip:
+        yield _tail_to_bytes(await aprocess_response(request, HttpResponse(), skip))
+
+
+def _cancel(state: StreamState):
+    # e.g. the view redirected, the out-of-order elements are not needed
+    for future in state.elements:
+        future.cancel()
+
+
+def to_streaming_response(
+    request: HttpRequest, response: Any, state: StreamState
+) -> Any:
+    """
+    Converts the response of a streaming view to a StreamingHttpResponse that
+    sends the content up to each deferred fragment as soon as it is available.
+    Out-of-order elements are appended as swap-oob fragments in the order they
+    finish, followed by a small script that swaps them in on full page loads.
+    Requests served by ASGI get an async stream.
+
+    The status and headers are fixed when the first chunk is sent. Response
+    handlers registered while the fragments render, e.g. with hook_swap_oob(),
+    run on an empty response at the end of the stream: their swap-oob
+    fragments are appended to the stream, their headers are discarded.
+    """
+    if not isinstance(response, HttpResponse):
+        _cancel(state)
+        return response
+    if not state.fragments and not state.elements:
+        return response
+
+    parts = state.split(response_to_bytes(response))
+    if len(parts) == 1 and not state.elements:
+        return response
+
+    streaming_content = (
+        _astream(request, parts, state, state.handled)
+        if isinstance(request, ASGIRequest)
+        else _stream(request, parts, state, state.handled)
+    )
+    streaming = StreamingHttpResponse(
+        streaming_content,
+        status=response.status_code,
+        reason=response.reason_phrase,
+        charset=response.charset,
+        headers={k: v for k, v in response.items() if k.lower() != "content-length"},
+    )
+    streaming.cookies = response.cookies
+    return streaming
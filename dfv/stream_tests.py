@@ -0,0 +1,246 @@
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import AsyncRequestFactory, RequestFactory
+
+from dfv import CachePolicy, element, param, view
+from dfv.fragment import lazy
+from dfv.response_handler import hook_push_url, hook_swap_oob
+
+
+def test_stream_sends_content_before_fragments(rf: RequestFactory):
+    calls = []
+
+    @view(stream=True)
+    def root(request):
+        fragment = lazy(child, request)
+        response = HttpResponse(f"<p>before</p>{fragment}<p>after</p>")
+        response["X-Page"] = "1"
+        return response
+
+    @element()
+    def child(_request):
+        calls.append("child")
+        return HttpResponse("child")
+
+    response = root(rf.get("/"))
+    assert isinstance(response, StreamingHttpResponse)
+    assert response["X-Page"] == "1"
+    assert response["Content-Type"] == "text/html; charset=utf-8"
+
+    chunks = iter(response)
+    assert next(chunks) == b"<p>before</p>"
+    assert calls == []
+    assert next(chunks) == (
+        b"<div id='child' hx-target='this' hx-swap='outerHTML' >child</div>"
+    )
+    assert calls == ["child"]
+    assert b"".join(chunks) == b"<p>after</p>"
+
+
+def test_stream_renders_nested_fragments_in_place(rf: RequestFactory):
+    @view(stream=True)
+    def root(request):
+        return HttpResponse(f"[{lazy(child, request)}]")
+
+    @view()
+    def child(request):
+        return HttpResponse(f"child {lazy(grandchild, request)}")
+
+    @view()
+    def grandchild(_request):
+        return HttpResponse("grandchild")
+
+    assert list(root(rf.get("/"))) == [b"[", b"child grandchild", b"]"]
+
+
+def test_stream_appends_swap_oob_of_fragments(rf: RequestFactory):
+    @view(stream=True)
+    def root(request):
+        hook_swap_oob(request, HttpResponse("<div id='root-oob'>r</div>"))
+        return HttpResponse(f"<p>page</p>{lazy(child, request)}")
+
+    @view()
+    def child(request):
+        hook_swap_oob(request, HttpResponse("<div id='child-oob'>c</div>"))
+        hook_push_url(request, "/child")
+        return HttpResponse("child")
+
+    response = root(rf.get("/"))
+    content = b"".join(response)
+    assert content == (
+        b"<p>page</p>child"
+        b'<div id="root-oob" hx-swap-oob="outerHTML:#root-oob">r</div>'
+        b'<div id="child-oob" hx-swap-oob="outerHTML:#child-oob">c</div>'
+    )
+    # the headers were sent before the fragment was rendered
+    assert "HX-Push-Url" not in response
+
+
+def test_stream_without_fragments(rf: RequestFactory):
+    @view(stream=True)
+    def root(_request):
+        return HttpResponse("page")
+
+    response = root(rf.get("/"))
+    assert not isinstance(response, StreamingHttpResponse)
+    assert response.content == b"page"
+
+
+def test_stream_async_for_asgi_requests():
+    @view(stream=True)
+    async def root(request):
+        return HttpResponse(
+            f"<p>before</p>{lazy(child, request)}{lazy(sync_child, request)}"
+        )
+
+    @view()
+    async def child(_request):
+        return HttpResponse("async child")
+
+    @view()
+    def sync_child(_request):
+        return HttpResponse("sync child")
+
+    async def consume(response):
+        return [chunk async for chunk in response]
+
+    response = async_to_sync(root)(AsyncRequestFactory().get("/"))
+    assert response.is_async
+    assert async_to_sync(consume)(response) == [
+        b"<p>before</p>",
+        b"async child",
+        b"sync child",
+    ]
+
+
+def test_stream_can_not_be_cached():
+    with pytest.raises(Exception, match="can not be cached"):
+        view(stream=True, cache=CachePolicy())
+
+
+def test_stream_out_of_order_elements(rf: RequestFactory):
+    slow_started = threading.Event()
+    release = threading.Event()
+
+    @view(stream=True)
+    def root(request):
+        return HttpResponse(f"{slow(request)}{fast(request)}<p>after</p>")
+
+    @element(out_of_order=True)
+    def slow(_request):
+        slow_started.set()
+        assert release.wait(5)
+        return HttpResponse("slow")
+
+    @element(out_of_order=True, tag="span")
+    def fast(_request):
+        return HttpResponse("fast")
+
+    response = root(rf.get("/"))
+    chunks = iter(response)
+    assert next(chunks) == (
+        b"<div id='slow' hx-target='this' hx-swap='outerHTML'  aria-busy=\"true\">"
+        b"</div>"
+        b"<span id='fast' hx-target='this' hx-swap='outerHTML'  aria-busy=\"true\">"
+        b"</span>"
+        b"<p>after</p>"
+    )
+    assert slow_started.wait(5)
+
+    # the fast element is sent first, although the page calls it last
+    fast_fill = next(chunks)
+    assert fast_fill.startswith(
+        b'<span id="fast" hx-target="this" hx-swap="outerHTML" '
+        b'hx-swap-oob="outerHTML:#fast">fast</span><script>'
+    )
+    release.set()
+    slow_fill = next(chunks)
+    assert slow_fill.startswith(
+        b'<div id="slow" hx-target="this" hx-swap="outerHTML" '
+        b'hx-swap-oob="outerHTML:#slow">slow</div><script>'
+    )
+    assert list(chunks) == []
+
+
+def test_stream_out_of_order_element_for_htmx_request(rf: RequestFactory):
+    @view(stream=True)
+    def root(request):
+        return HttpResponse(f"{child(request)}")
+
+    @element(out_of_order=True)
+    def child(request):
+        hook_swap_oob(request, HttpResponse("<div id='other'>o</div>"))
+        return HttpResponse("child")
+
+    response = root(rf.get("/", headers={"HX-Request": "true"}))
+    assert b"".join(response) == (
+        b"<div id='child' hx-target='this' hx-swap='outerHTML'  aria-busy=\"true\">"
+        b"</div>"
+        b'<div id="child" hx-target="this" hx-swap="outerHTML" '
+        b'hx-swap-oob="outerHTML:#child">child</div>'
+        b'<div id="other" hx-swap-oob="outerHTML:#other">o</div>'
+    )
+
+
+def test_stream_out_of_order_elements_consume_params_in_call_order(
+    rf: RequestFactory,
+):
+    @view(stream=True)
+    def root(request):
+        first_placeholder = first(request)
+        # consumed before the element is handed to the thread pool
+        assert "p" not in request.GET
+        return HttpResponse(f"{first_placeholder}{second(request)}")
+
+    @element(out_of_order=True)
+    def first(_request, p: str = param("default")):
+        return HttpResponse(p)
+
+    @element(out_of_order=True)
+    def second(_request, p: str = param("default")):
+        return HttpResponse(p)
+
+    content = b"".join(root(rf.get("/?p=a")))
+    assert b'hx-swap-oob="outerHTML:#first">a</div>' in content
+    assert b'hx-swap-oob="outerHTML:#second">default</div>' in content
+
+
+def test_out_of_order_element_without_stream(rf: RequestFactory):
+    @view()
+    def root(request):
+        return HttpResponse(f"{child(request)}")
+
+    @element(out_of_order=True)
+    def child(_request):
+        return HttpResponse("child")
+
+    assert root(rf.get("/")).content == (
+        b"<div id='child' hx-target='this' hx-swap='outerHTML' >child</div>"
+    )
+
+
+def test_stream_async_out_of_order_element():
+    @view(stream=True)
+    async def root(request):
+        placeholder = await child(request)
+        assert "p" not in request.GET
+        return HttpResponse(f"{placeholder}<p>after</p>")
+
+    @element(out_of_order=True)
+    async def child(_request, p: str = param()):
+        return HttpResponse(p)
+
+    async def consume():
+        # under ASGI, the view and the stream run on the same event loop
+        request = AsyncRequestFactory().get("/?p=child", headers={"HX-Request": "true"})
+        return [chunk async for chunk in await root(request)]
+
+    assert async_to_sync(consume)() == [
+        b"<div id='child' hx-target='this' hx-swap='outerHTML'  aria-busy=\"true\">"
+        b"</div><p>after</p>",
+        b'<div id="child" hx-target="this" hx-swap="outerHTML" '
+        b'hx-swap-oob="outerHTML:#child">child</div>',
+    ]
@@ -1,10 +1,14 @@
 import lxml.html
 import pytest
+from asgiref.sync import async_to_sync
 from django.http import HttpResponse
+from django.template.response import TemplateResponse
 from django.test import RequestFactory
+from django_htmx.middleware import HtmxDetails
 
 from dfv import element
-from dfv.htmx import swap_oob
+from dfv.fragment import lazy
+from dfv.htmx import get_htmx, swap_oob
 from dfv.response_handler import hook_swap_oob
 from dfv.utils import response_to_str
 from dfv.view import view, ViewResponse
@@ -87,3 +91,48 @@ def test_hook_swap_oob_with_action_view_function(rf: RequestFactory):
     assert parsed[0].tag == "dummy"
     assert parsed[1].attrib["id"] == "el"
     assert parsed[1].attrib["hx-swap-oob"] == "outerHTML:#el"
+
+
+def test_hook_swap_oob_in_lazy_fragment_of_template_response(rf: RequestFactory):
+    @view()
+    def page(request):
+        return TemplateResponse(
+            request, "dfv/tests/TemplateResponse.html", {"foo": lazy(child, request)}
+        )
+
+    @element()
+    def child(request):
+        hook_swap_oob(request, HttpResponse("<div id='oob'>oob</div>"))
+        return HttpResponse("child")
+
+    parsed = lxml.html.fragments_fromstring(response_to_str(page(rf.get("/"))))
+    assert [el.attrib["id"] for el in parsed] == ["child", "oob"]
+
+
+def test_hook_swap_oob_in_lazy_fragment_of_async_template_response(
+    rf: RequestFactory,
+):
+    @view()
+    async def page(request):
+        return TemplateResponse(
+            request, "dfv/tests/TemplateResponse.html", {"foo": lazy(child, request)}
+        )
+
+    @element()
+    def child(request):
+        hook_swap_oob(request, HttpResponse("<div id='oob'>oob</div>"))
+        return HttpResponse("child")
+
+    response = async_to_sync(page)(rf.get("/"))
+    parsed = lxml.html.fragments_fromstring(response_to_str(response))
+    assert [el.attrib["id"] for el in parsed] == ["child", "oob"]
+
+
+def test_get_htmx(rf: RequestFactory):
+    request = rf.get("/", headers={"HX-Request": "true", "HX-Target": "el"})
+    assert get_htmx(request)
+    assert get_htmx(request).target == "el"
+    assert not get_htmx(rf.get("/"))
+
+    request.htmx = HtmxDetails(request)
+    assert get_htmx(request) is request.htmx
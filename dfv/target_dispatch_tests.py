@@ -0,0 +1,123 @@
+import lxml.html
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.test import RequestFactory
+
+from dfv import element, view
+from dfv.cache import CachePolicy
+from dfv.fragment import lazy
+from dfv.response_handler import hook_swap_oob
+from dfv.utils import response_to_str
+
+
+def _htmx_request(rf: RequestFactory, target: str):
+    return rf.get("/", HTTP_HX_REQUEST="true", HTTP_HX_TARGET=target)
+
+
+def test_only_target_element_is_rendered(rf: RequestFactory):
+    calls = []
+
+    @view(target_dispatch=True)
+    def page(request):
+        calls.append("page")
+        content = str(first(request)) + str(second(request)) + str(third(request))
+        calls.append("page template")
+        return HttpResponse(f"<main>{content}</main>")
+
+    @element()
+    def first(_request):
+        calls.append("first")
+        return HttpResponse("first")
+
+    @element()
+    def second(_request):
+        calls.append("second")
+        return HttpResponse("second")
+
+    @element()
+    def third(_request):
+        calls.append("third")
+        return HttpResponse("third")
+
+    response = page(_htmx_request(rf, "second"))
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(response_to_str(response))
+    assert parsed.attrib["id"] == "second"
+    assert calls == ["page", "first", "second"]
+    assert "HX-Target" in response["Vary"]
+
+
+def test_full_page_without_htmx(rf: RequestFactory):
+    @view(target_dispatch=True)
+    def page(request):
+        return HttpResponse("<main>" + str(child(request)) + "</main>")
+
+    @element()
+    def child(_request):
+        return HttpResponse("child")
+
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(
+        response_to_str(page(rf.get("/")))
+    )
+    assert parsed.tag == "main"
+
+
+def test_target_element_with_cache(rf: RequestFactory):
+    calls = []
+
+    @view(cache=CachePolicy(), target_dispatch=True)
+    def page(request):
+        calls.append("page")
+        return HttpResponse("<main>" + str(inner_el(request)) + "</main>")
+
+    @element()
+    def inner_el(_request):
+        calls.append("inner_el")
+        return HttpResponse("inner")
+
+    assert lxml.html.fromstring(response_to_str(page(rf.get("/")))).tag == "main"
+    response = page(_htmx_request(rf, "inner_el"))
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(response_to_str(response))
+    assert parsed.attrib["id"] == "inner_el"
+    assert calls == ["page", "inner_el", "page", "inner_el"]
+
+    page(rf.get("/"))
+    assert calls == ["page", "inner_el", "page", "inner_el"]
+
+
+def test_target_element_in_lazy_template_fragment(rf: RequestFactory):
+    calls = []
+
+    @view(target_dispatch=True)
+    def page(request):
+        return render(
+            request,
+            "dfv/tests/TemplateResponse.html",
+            {"foo": lazy(child, request)},
+        )
+
+    @element()
+    def child(request):
+        calls.append("child")
+        hook_swap_oob(request, HttpResponse("<div id='oob'>oob</div>"))
+        return HttpResponse("child")
+
+    response = page(_htmx_request(rf, "child"))
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(response_to_str(response))
+    assert parsed[0].attrib["id"] == "child"
+    assert parsed[1].attrib["id"] == "oob"
+    assert calls == ["child"]
+
+
+def test_target_dispatch_disabled(rf: RequestFactory):
+    @view()
+    def page(request):
+        return HttpResponse("<main>" + str(child(request)) + "</main>")
+
+    @element()
+    def child(_request):
+        return HttpResponse("child")
+
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(
+        response_to_str(page(_htmx_request(rf, "child")))
+    )
+    assert parsed.tag == "main"
@@ -0,0 +1,156 @@
+import weakref
+from typing import Any, Optional, Sequence
+
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import render
+from django.template import loader
+from django.template.base import Template
+from django.template.context import make_context
+from django.utils.cache import patch_vary_headers
+from django.template.loader_tags import (
+    BLOCK_CONTEXT_KEY,
+    BlockContext,
+    BlockNode,
+    ExtendsNode,
+)
+
+from dfv.htmx import get_htmx
+
+# the block nodes of a compiled template, by block name
+_block_nodes: "weakref.WeakKeyDictionary[Template, dict[str, BlockNode]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_block_nodes(template: Template) -> dict[str, BlockNode]:
+    block_nodes = _block_nodes.get(template)
+    if block_nodes is None:
+        block_nodes = {
+            node.name: node for node in template.nodelist.get_nodes_by_type(BlockNode)
+        }
+        _block_nodes[template] = block_nodes
+    return block_nodes
+
+
+def _get_extends_node(template: Template) -> Optional[ExtendsNode]:
+    return next((n for n in template.nodelist if isinstance(n, ExtendsNode)), None)
+
+
+def _render_blocks(
+    template_name: str,
+    block_names: Sequence[str],
+    context: Optional[dict[str, Any]],
+    request: Optional[HttpRequest],
+    using: Optional[str],
+) -> dict[str, str]:
+    backend_template = loader.get_template(template_name, using=using)
+    template: Optional[Template] = getattr(backend_template, "template", None)
+    if template is None:
+        raise Exception("Blocks can only be rendered from Django templates.")
+
+    context_obj = make_context(context, request, autoescape=template.engine.autoescape)
+    with context_obj.render_context.push_state(template), context_obj.bind_template(
+        template
+    ):
+        context_obj.template_name = template.name
+        # collect the blocks from the template and the templates it extends, as
+        # ExtendsNode.render() does
+        block_context = BlockContext()
+        nodes: dict[str, BlockNode] = {}
+        current: Optional[Template] = template
+        while current is not None:
+            block_nodes = _get_block_nodes(current)
+            block_context.add_blocks(block_nodes)
+            for name in block_names:
+                if name not in nodes and name in block_nodes:
+                    nodes[name] = block_nodes[name]
+            extends_node = _get_extends_node(current)
+            current = (
+                extends_node.get_parent(context_obj)
+                if extends_node is not None
+                else None
+            )
+
+        context_obj.render_context[BLOCK_CONTEXT_KEY] = block_context
+        return {name: node.render(context_obj) for name, node in nodes.items()}
+
+
+def _block_not_found(template_name: str, block_name: str) -> Exception:
+    return Exception(f"Block '{block_name}' not found in template '{template_name}'.")
+
+
+def render_block_to_string(
+    template_name: str,
+    block_name: str,
+    context: Optional[dict[str, Any]] = None,
+    request: Optional[HttpRequest] = None,
+    using: Optional[str] = None,
+) -> str:
+    """
+    Renders the block `block_name` of a template with the full context, without
+    rendering the rest of the template. Blocks of templates that the template
+    extends are found as well, and {{ block.super }} works as usual.
+    """
+    blocks = _render_blocks(template_name, [block_name], context, request, using)
+    if block_name not in blocks:
+        raise _block_not_found(template_name, block_name)
+    return blocks[block_name]
+
+
+def render_block(
+    request: HttpRequest,
+    template_name: str,
+    block_name: str,
+    context: Optional[dict[str, Any]] = None,
+    content_type: Optional[str] = None,
+    status: Optional[int] = None,
+    using: Optional[str] = None,
+) -> HttpResponse:
+    """
+    Like django.shortcuts.render(), but only renders the block `block_name`.
+    """
+    content = render_block_to_string(
+        template_name, block_name, context, request, using=using
+    )
+    return HttpResponse(content, content_type, status)
+
+
+def _keeps_layout(request: HttpRequest) -> bool:
+    # htmx requests a full page when it restores a page that is not in its
+    # history cache
+    htmx = get_htmx(request)
+    return bool(htmx) and not htmx.history_restore_request
+
+
+def render_page(
+    request: HttpRequest,
+    template_name: str,
+    context: Optional[dict[str, Any]] = None,
+    content_type: Optional[str] = None,
+    status: Optional[int] = None,
+    using: Optional[str] = None,
+    block="body",
+    title_block: Optional[str] = "title",
+) -> HttpResponse:
+    """
+    Like django.shortcuts.render(), but htmx requests, e.g. hx-boost
+    navigation, only get the block `block` of the page, since the client keeps
+    its layout. The head, scripts and the rest of the layout are not rendered.
+
+    The block `title_block` is prepended as a <title> element, which htmx uses
+    to update the document title.
+    """
+    if not _keeps_layout(request):
+        response = render(request, template_name, context, content_type, status, using)
+    else:
+        names = [block] if title_block is None else [block, title_block]
+        blocks = _render_blocks(template_name, names, context, request, using)
+        if block not in blocks:
+            raise _block_not_found(template_name, block)
+        content = blocks[block]
+        if title_block in blocks:
+            content = f"<title>{blocks[title_block].strip()}</title>{content}"
+        response = HttpResponse(content, content_type, status)
+
+    patch_vary_headers(response, ("HX-Request", "HX-History-Restore-Request"))
+    return response
@@ -0,0 +1,96 @@
+import lxml.html
+import pytest
+from django.test import RequestFactory
+
+from dfv import element
+from dfv.template_block import render_block, render_block_to_string, render_page
+from dfv.utils import response_to_str
+
+
+class _Recorder:
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "outside"
+
+
+def test_render_block_of_template():
+    outside = _Recorder()
+    content = render_block_to_string(
+        "dfv/tests/BlockBase.html", "body", {"foo": 1, "outside": outside}
+    )
+    assert content == "<p>base 1</p>base inner"
+    assert outside.calls == 0
+
+
+def test_render_block_of_extended_template():
+    content = render_block_to_string("dfv/tests/BlockChild.html", "inner", {"foo": 1})
+    assert content == "child inner 1 base inner"
+
+
+def test_render_block_of_parent_template_uses_child_blocks():
+    content = render_block_to_string("dfv/tests/BlockChild.html", "body", {"foo": 1})
+    assert content == "<p>base 1</p>child inner 1 base inner"
+
+
+def test_render_block_not_found():
+    with pytest.raises(Exception, match="not found"):
+        render_block_to_string("dfv/tests/BlockChild.html", "missing")
+
+
+def test_render_block_in_element(rf: RequestFactory):
+    @element()
+    def viewfn(request):
+        return render_block(request, "dfv/tests/BlockChild.html", "inner", {"foo": 2})
+
+    parsed: lxml.html.HtmlElement = lxml.html.fromstring(
+        response_to_str(viewfn(rf.get("/")))
+    )
+    assert parsed.attrib["id"] == "viewfn"
+    assert parsed.text == "child inner 2 base inner"
+
+
+def test_render_page_renders_full_page(rf: RequestFactory):
+    response = render_page(
+        rf.get("/"), "dfv/tests/BlockChild.html", {"foo": 1, "outside": "x"}
+    )
+    content = response_to_str(response)
+    assert "<html>" in content
+    assert "child inner 1 base inner" in content
+    assert response["Vary"] == "HX-Request, HX-History-Restore-Request"
+
+
+def test_render_page_renders_body_block_for_htmx_requests(rf: RequestFactory):
+    outside = _Recorder()
+    response = render_page(
+        rf.get("/", headers={"HX-Request": "true", "HX-Boosted": "true"}),
+        "dfv/tests/BlockChild.html",
+        {"foo": 1, "outside": outside},
+        title_block="head",
+    )
+    assert response_to_str(response) == "<title>outside</title>" + (
+        "<p>base 1</p>child inner 1 base inner"
+    )
+    assert response["Vary"] == "HX-Request, HX-History-Restore-Request"
+
+
+def test_render_page_without_title_block(rf: RequestFactory):
+    response = render_page(
+        rf.get("/", headers={"HX-Request": "true"}),
+        "dfv/tests/BlockChild.html",
+        {"foo": 1},
+    )
+    assert response_to_str(response) == "<p>base 1</p>child inner 1 base inner"
+
+
+def test_render_page_renders_full_page_for_history_restore(rf: RequestFactory):
+    response = render_page(
+        rf.get(
+            "/", headers={"HX-Request": "true", "HX-History-Restore-Request": "true"}
+        ),
+        "dfv/tests/BlockChild.html",
+        {"foo": 1, "outside": "x"},
+    )
+    assert "<html>" in response_to_str(response)
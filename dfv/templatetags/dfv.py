@@ -1,9 +1,13 @@
 from django import template
 from django.template import RequestContext
 from django.templatetags.static import static
+from django.urls import NoReverseMatch, reverse
 from django.utils.html import format_html
 
+from dfv.batch import BATCH_PATH_NAME
+from dfv.element import lazy_element
 from dfv.route import reverse_view
+from dfv.utils import response_to_str
 from dfv.view_stack import get_view_fn_call_stack_from_request_or_raise
 
 register = template.Library()
@@ -11,9 +15,14 @@ register = template.Library()
 
 @register.simple_tag
 def dfv():
+    try:
+        batch_url = reverse(BATCH_PATH_NAME)
+    except NoReverseMatch:
+        batch_url = ""
     return format_html(
-        '<script type="text/javascript" defer src="{}"></script>',
+        '<script type="text/javascript" defer src="{}" data-batch-url="{}"></script>',
         static("../static/dfv.js"),
+        batch_url,
     )
 
 
@@ -30,3 +39,15 @@ def view_url(context: RequestContext):
     stack = get_view_fn_call_stack_from_request_or_raise(context.request)
     view = stack[-1]
     return reverse_view(view)
+
+
+@register.simple_tag
+def dfv_lazy_element(element_fn, trigger="load", **params):
+    """
+    Outputs a placeholder that loads the element after the page is shown:
+
+        {% dfv_lazy_element details_element item=item trigger="revealed" %}
+
+    See dfv.element.lazy_element().
+    """
+    return response_to_str(lazy_element(element_fn, params, trigger))
@@ -1,15 +1,16 @@
 import typing
 from typing import Any, Optional
 from urllib.parse import urlencode
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 import pytest
+from asgiref.sync import async_to_sync
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import HttpResponse
+from django.http import HttpResponse, QueryDict
 from django.test import RequestFactory
 
 from dfv import inject_args, param, param_get, param_post, view
-from dfv.inject_args import ObjectDoesNotExistWithPk
+from dfv.inject_args import get_request_params, ObjectDoesNotExistWithPk
 from main.models import AppUser
 
 
@@ -144,6 +145,24 @@ def test_type_conversion_list_annotated(rf: RequestFactory):
     viewfn(rf.get("/?p1=1&p1=2"))
 
 
+def test_type_conversion_uuid(rf: RequestFactory):
+    value = uuid4()
+
+    @view()
+    def viewfn(_request, p1: UUID = param_get()):
+        assert p1 == value
+
+    viewfn(rf.get(f"/?p1={value}"))
+
+
+def test_type_conversion_list_of_optional(rf: RequestFactory):
+    @view()
+    def viewfn(_request, p1: list[Optional[int]] = param_get()):
+        assert p1 == [1, 2]
+
+    viewfn(rf.get("/?p1=1&p1=2"))
+
+
 @pytest.mark.django_db
 def test_type_conversion_model(rf: RequestFactory):
     @view()
@@ -224,6 +243,169 @@ def test_type_conversion_model_with_union_none_value_is_none(rf: RequestFactory)
     viewfn(rf.get("/"))
 
 
+@pytest.mark.django_db
+def test_type_conversion_model_list_uses_one_query(
+    rf: RequestFactory, django_assert_num_queries
+):
+    users = [AppUser.objects.create(username=f"user{i}") for i in range(3)]
+    ids = [users[2].id, users[0].id, users[1].id]
+
+    @view()
+    def viewfn(_request, user_list: list[AppUser] = param()):
+        assert [u.id for u in user_list] == ids
+
+    query = "&".join(f"user_list={i}" for i in ids)
+    with django_assert_num_queries(1):
+        viewfn(rf.get(f"/?{query}"))
+
+
+@pytest.mark.django_db
+def test_type_conversion_model_params_use_one_query_per_model(
+    rf: RequestFactory, django_assert_num_queries
+):
+    user1 = AppUser.objects.create(username="user1")
+    user2 = AppUser.objects.create(username="user2")
+
+    @view()
+    def viewfn(
+        _request,
+        u1: AppUser = param(),
+        u2: Optional[AppUser] = param(),
+        u3: list[AppUser] = param(),
+    ):
+        assert u1 == user1
+        assert u2 == user2
+        assert u3 == [user2, user1]
+
+    with django_assert_num_queries(1):
+        viewfn(rf.get(f"/?u1={user1.id}&u2={user2.id}&u3={user2.id}&u3={user1.id}"))
+
+
+@pytest.mark.django_db
+def test_type_conversion_model_list_missing_pk(rf: RequestFactory):
+    user = AppUser.objects.create(username="user")
+    wrong_id = uuid4()
+
+    @view()
+    def viewfn(_request, users: list[AppUser | ObjectDoesNotExistWithPk] = param()):
+        assert users[0] == user
+        assert isinstance(users[1], ObjectDoesNotExistWithPk)
+        assert users[1].pk == str(wrong_id)
+
+    viewfn(rf.get(f"/?users={user.id}&users={wrong_id}"))
+
+    @view()
+    def viewfn_raises(_request, users: list[AppUser] = param()):
+        pass
+
+    with pytest.raises(AppUser.DoesNotExist):
+        viewfn_raises(rf.get(f"/?users={user.id}&users={wrong_id}"))
+
+
+@pytest.mark.django_db
+def test_type_conversion_model_nested_views_share_instance(
+    rf: RequestFactory, django_assert_num_queries
+):
+    app_user = AppUser.objects.create(username="testuser")
+    state = []
+
+    @view()
+    def viewfn1(request, user: AppUser = param(consume=False)):
+        state.append(user)
+        viewfn2(request)
+
+    @view()
+    def viewfn2(_request, user: AppUser = param()):
+        state.append(user)
+
+    with django_assert_num_queries(1):
+        viewfn1(rf.get(f"/?user={app_user.id}"))
+    assert state[0] is state[1]
+
+
+@pytest.mark.django_db
+def test_type_conversion_model_fresh(rf: RequestFactory, django_assert_num_queries):
+    app_user = AppUser.objects.create(username="testuser")
+    state = []
+
+    @view()
+    def viewfn1(request, user: AppUser = param(consume=False)):
+        state.append(user)
+        AppUser.objects.filter(id=user.id).update(username="changed")
+        viewfn2(request)
+
+    @view()
+    def viewfn2(_request, user: AppUser = param(fresh=True)):
+        state.append(user)
+
+    with django_assert_num_queries(3):
+        viewfn1(rf.get(f"/?user={app_user.id}"))
+    assert state[0] is not state[1]
+    assert state[1].username == "changed"
+
+
+@pytest.mark.django_db
+def test_type_conversion_model_with_queryset(
+    rf: RequestFactory, django_assert_num_queries
+):
+    app_user = AppUser.objects.create(username="testuser", email="a@b.c")
+
+    @view()
+    def viewfn(
+        _request,
+        user: AppUser = param(queryset=AppUser.objects.only("username")),
+    ):
+        assert user.get_deferred_fields() >= {"email"}
+        assert user.username == "testuser"
+
+    with django_assert_num_queries(1):
+        viewfn(rf.get(f"/?user={app_user.id}"))
+
+
+@pytest.mark.django_db
+def test_type_conversion_model_with_queryset_does_not_match(rf: RequestFactory):
+    app_user = AppUser.objects.create(username="testuser")
+
+    @view()
+    def viewfn(
+        _request,
+        user: AppUser
+        | ObjectDoesNotExist = param(
+            queryset=AppUser.objects.exclude(username="testuser")
+        ),
+    ):
+        assert isinstance(user, ObjectDoesNotExist)
+
+    viewfn(rf.get(f"/?user={app_user.id}"))
+
+
+def test_queryset_must_match_model_type():
+    def test():
+        @view()
+        def viewfn(_request, p1: str = param(queryset=AppUser.objects.all())):
+            pass
+
+    with pytest.raises(Exception, match="queryset of parameter 'p1'"):
+        test()
+
+
+@pytest.mark.django_db
+def test_type_conversion_model_async_view(
+    rf: RequestFactory, django_assert_num_queries
+):
+    user1 = AppUser.objects.create(username="user1")
+    user2 = AppUser.objects.create(username="user2")
+
+    @view()
+    async def viewfn(_request, u1: AppUser = param(), u2: list[AppUser] = param()):
+        assert u1 == user1
+        assert u2 == [user2, user1]
+        return HttpResponse("")
+
+    with django_assert_num_queries(1):
+        async_to_sync(viewfn)(rf.get(f"/?u1={user1.id}&u2={user2.id}&u2={user1.id}"))
+
+
 def test_post(rf: RequestFactory):
     @view()
     def viewfn(
@@ -312,6 +494,74 @@ def test_param_consume_post(rf: RequestFactory):
     viewfn(rf.post("/", {"p1": "a"}))
 
 
+def test_param_consume_nested_views(rf: RequestFactory):
+    @view()
+    def viewfn1(request, p1: str = param()):
+        assert p1 == "a"
+        get = request.GET
+        viewfn2(request)
+        assert "p2" in get
+        assert "p2" not in request.GET
+        assert request.GET.getlist("p3") == ["c", "d"]
+
+    @view()
+    def viewfn2(request, p2: str = param()):
+        assert p2 == "b"
+        assert "p1" not in request.GET
+        assert "p2" not in request.GET
+
+    viewfn1(rf.get("/?p1=a&p2=b&p3=c&p3=d"))
+
+
+def test_request_params_are_shared_by_nested_views(rf: RequestFactory):
+    @view()
+    def viewfn1(request, p1: str = param()):
+        params = get_request_params(request)
+        assert p1 == "a"
+        viewfn2(request)
+        assert get_request_params(request) is params
+
+    @view()
+    def viewfn2(request, p2: str = param()):
+        assert p2 == "b"
+        assert "p1" not in get_request_params(request).get
+
+    viewfn1(rf.get("/?p1=a&p2=b"))
+
+
+def test_request_params_are_recreated_if_querydict_was_replaced(rf: RequestFactory):
+    @view()
+    def viewfn1(request, p1: str = param(consume=False)):
+        assert p1 == "a"
+        request.GET = QueryDict("p1=b")
+        viewfn2(request)
+
+    @view()
+    def viewfn2(_request, p1: str = param()):
+        assert p1 == "b"
+
+    viewfn1(rf.get("/?p1=a"))
+
+
+def test_param_consume_body(rf: RequestFactory):
+    @view()
+    def viewfn1(request, p1: str = param()):
+        assert p1 == "a"
+        viewfn2(request)
+
+    @view()
+    def viewfn2(_request, p1: Optional[str] = param()):
+        assert p1 is None
+
+    viewfn1(
+        rf.patch(
+            "/",
+            urlencode({"p1": "a"}),
+            content_type="application/x-www-form-urlencoded",
+        )
+    )
+
+
 def test_auto_default_value(rf: RequestFactory):
     @view()
     def viewfn(_request, p1: str = param(default="a")):
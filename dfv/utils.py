@@ -1,23 +1,49 @@
 from typing import Any
 
+from django.db import models
 from django.http import HttpRequest, HttpResponse, QueryDict
-from django.template.response import TemplateResponse
+from django.template.response import SimpleTemplateResponse, TemplateResponse
+from django.utils.http import urlencode
 from django.utils.safestring import mark_safe, SafeString
 
 
-def querydict_key_removed(querydict: dict, key) -> QueryDict:
-    temp = QueryDict(mutable=True)
-    temp.update(querydict)
-    del temp[key]
-    return temp
+def querydict_key_consumed(querydict: QueryDict, key: str) -> QueryDict:
+    """
+    Returns a mutable copy of the QueryDict without the key. Only the value
+    lists are copied, the values are not parsed or appended again.
+    """
+    result = QueryDict(mutable=True, encoding=querydict.encoding)
+    # the keys already are text, QueryDict.setlist() would convert them again
+    dict.update(result, ((k, v[:]) for k, v in querydict.lists() if k != key))
+    return result
 
 
 def _get_request_from_args(args: list[Any]) -> HttpRequest:
     return args[0]
 
 
+def response_to_bytes(response: HttpResponse | TemplateResponse) -> bytes:
+    if isinstance(response, SimpleTemplateResponse):
+        response.render()
+
+    return response.content
+
+
 def response_to_str(response: HttpResponse | TemplateResponse) -> SafeString:
-    if isinstance(response, TemplateResponse):
-        response = response.render()
+    return mark_safe(str(response_to_bytes(response), "utf-8"))
+
+
+def _query_value(value: Any) -> Any:
+    return value.pk if isinstance(value, models.Model) else value
+
 
-    return mark_safe(str(response.content, "utf-8"))
+def _encode_params(params: dict[str, Any]) -> str:
+    return urlencode(
+        {
+            name: [_query_value(v) for v in value]
+            if isinstance(value, (list, tuple))
+            else _query_value(value)
+            for name, value in params.items()
+        },
+        doseq=True,
+    )
@@ -0,0 +1,53 @@
+import copy
+import pickle
+
+from django.http import QueryDict
+
+from dfv.utils import querydict_key_consumed
+
+
+def test_consumed_key_is_hidden():
+    qd = querydict_key_consumed(QueryDict("a=1&b=2&b=3"), "a")
+    assert "a" not in qd
+    assert qd.get("a") is None
+    assert qd.getlist("a") == []
+    assert list(qd) == ["b"]
+    assert qd["b"] == "3"
+    assert qd.getlist("b") == ["2", "3"]
+    assert len(qd) == 1
+
+
+def test_consume_does_not_change_previous_querydict():
+    original = QueryDict("a=1&b=2")
+    qd1 = querydict_key_consumed(original, "a")
+    qd2 = querydict_key_consumed(qd1, "b")
+    assert "a" in original
+    assert "b" in qd1
+    assert "b" not in qd2
+    assert not qd2
+    assert qd1.dict() == {"b": "2"}
+
+
+def test_copy_returns_mutable_querydict():
+    qd = querydict_key_consumed(QueryDict("a=1&b=2"), "a")
+    copy = qd.copy()
+    assert isinstance(copy, QueryDict)
+    copy["c"] = "3"
+    assert copy.urlencode() == "b=2&c=3"
+    assert qd.urlencode() == "b=2"
+
+
+def test_consumed_querydict_is_a_mutable_querydict():
+    original = QueryDict("a=1&b=2")
+    qd = querydict_key_consumed(original, "a")
+    assert isinstance(qd, QueryDict)
+    qd.appendlist("b", "3")
+    assert qd.getlist("b") == ["2", "3"]
+    assert original.getlist("b") == ["2"]
+
+
+def test_copies_of_consumed_querydict_hide_consumed_keys():
+    qd = querydict_key_consumed(QueryDict("a=1&b=2"), "a")
+    assert copy.copy(qd).dict() == {"b": "2"}
+    assert copy.deepcopy(qd).dict() == {"b": "2"}
+    assert pickle.loads(pickle.dumps(qd)).dict() == {"b": "2"}
@@ -1,40 +1,267 @@
 import functools
-from typing import Callable, cast, Optional, TypeVar
+import inspect
+from typing import Any, Callable, cast, Optional, TypeVar
 
-import wrapt
+from asgiref.sync import sync_to_async
 from django.contrib.auth import decorators as auth_decorators
 from django.http import HttpRequest, HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import patch_vary_headers
 
+from dfv.cache import (
+    astore_cached_response,
+    cache_view_fn,
+    CachePolicy,
+    store_cached_response,
+)
+from dfv.conditional import apply_etag, FRESHNESS, freshness_view_fn
+from dfv.htmx import get_htmx
 from dfv.inject_args import inject_args
-from dfv.response_handler import process_response
-from dfv.utils import response_to_str
-from dfv.view_stack import get_view_fn_call_stack_from_request
+from dfv.response_handler import aprocess_response, process_response
+from dfv.stream import (
+    arender_deferring_fragments,
+    StreamState,
+    render_deferring_fragments,
+    to_streaming_response,
+)
+from dfv.utils import response_to_bytes, response_to_str
+from dfv.view_stack import (
+    fork_view_fn_call_stack,
+    get_view_fn_call_stack_from_request,
+)
 
 VIEW_FN = TypeVar("VIEW_FN", bound=Callable[..., HttpResponse])
 
 
-class ViewResponse(wrapt.ObjectProxy):
-    def __init__(self, response: HttpResponse | None):
-        if response is not None:
-            content = response_to_str(response)
-            bcontent = bytes(content, "UTF-8")
-            dfv_swap_oob = getattr(response, "_dfv_swap_oob", [])
-            for oob in dfv_swap_oob:
-                bcontent += oob
-            response.content = bcontent
+_view_response_classes: dict[tuple[type, type], type] = {}
 
-        super().__init__(response)
+
+def _original_response_class(response: HttpResponse) -> type[HttpResponse]:
+    return getattr(type(response), "_dfv_response_class", type(response))
+
+
+def _view_response_class(cls: type, response_class: type) -> type:
+    if issubclass(cls, response_class):
+        return cls
+
+    key = (cls, response_class)
+    view_response_class = _view_response_classes.get(key)
+    if view_response_class is None:
+        view_response_class = type(
+            cls.__name__,
+            (cls, response_class),
+            {
+                "__slots__": (),
+                "__module__": cls.__module__,
+                "__qualname__": cls.__qualname__,
+                "_dfv_response_class": response_class,
+            },
+        )
+        _view_response_classes[key] = view_response_class
+    return view_response_class
+
+
+def _restore_response(response_class: type, state: dict) -> HttpResponse:
+    response: HttpResponse = object.__new__(response_class)
+    response.__dict__.update(state)
+    return response
+
+
+class ViewResponse(HttpResponse):
+    """
+    The response of a view. It takes over the state of the response returned by
+    the view fn. Its class also derives from the class of that response, so
+    checks like isinstance(response, TemplateResponse) still work.
+
+    The body is kept as byte chunks of the content, followed by the swap-oob
+    fragments, so composing nested views never decodes or re-encodes content.
+    The chunks are joined once, when the content is accessed, e.g. by a template
+    or by Django's response handling.
+    """
+
+    __slots__ = ("_dfv_chunks", "_dfv_swap_oob")
+
+    _dfv_chunks: Optional[list[bytes]]
+    _dfv_swap_oob: list[bytes]
+
+    def __new__(cls, response: HttpResponse, *args, **kwargs):
+        return super().__new__(
+            _view_response_class(cls, _original_response_class(response))
+        )
+
+    def __init__(self, response: HttpResponse):
+        if isinstance(response, ViewResponse):
+            chunks = response.chunks
+            if chunks is None:
+                chunks = [response.content]
+            swap_oob = list(response.swap_oob_chunks)
+        else:
+            chunks = [response_to_bytes(response)]
+            swap_oob = list(getattr(response, "_dfv_swap_oob", []))
+
+        self.__dict__.update(response.__dict__)
+        self.__dict__.pop("_dfv_swap_oob", None)
+        self._dfv_chunks = list(chunks)
+        self._dfv_swap_oob = swap_oob
+
+    @property
+    def chunks(self) -> Optional[list[bytes]]:
+        """
+        The byte chunks of a content that was not joined yet, None otherwise.
+        """
+        return self._dfv_chunks
+
+    @property
+    def swap_oob_chunks(self) -> list[bytes]:
+        """
+        The swap-oob fragments that were not joined with the content yet.
+        """
+        return self._dfv_swap_oob
+
+    def _set_content(self, value: Any):
+        cast(Any, super(ViewResponse, type(self))).content.fset(self, value)
+
+    def _materialize(self):
+        if self._dfv_chunks is None and not self._dfv_swap_oob:
+            return
+
+        chunks = self._dfv_chunks if self._dfv_chunks is not None else [super().content]
+        chunks = chunks + self._dfv_swap_oob
+        self._dfv_chunks = None
+        self._dfv_swap_oob = []
+        self._set_content(chunks[0] if len(chunks) == 1 else b"".join(chunks))
+
+    @property  # type: ignore[override]
+    def content(self) -> bytes:
+        self._materialize()
+        return super().content
+
+    @content.setter
+    def content(self, value: Any):
+        self._dfv_chunks = None
+        self._dfv_swap_oob = []
+        self._set_content(value)
+
+    def __iter__(self):
+        self._materialize()
+        return super().__iter__()
+
+    def write(self, content):
+        self._materialize()
+        super().write(content)
+
+    def __reduce__(self):
+        # pickle, e.g. for caching, as an instance of the original response class
+        self._materialize()
+        response_class = _original_response_class(self)
+        response = object.__new__(response_class)
+        response.__dict__.update(self.__dict__)
+        state = (
+            response.__getstate__()
+            if hasattr(response, "__getstate__")
+            else response.__dict__
+        )
+        return _restore_response, (response_class, state)
 
     def __str__(self):
         return response_to_str(self)
 
 
+class TargetElementRendered(Exception):  # noqa: N818
+    """
+    Raised by the element that is the target of an htmx request, to skip the
+    rendering of the rest of the page. See view(target_dispatch=True).
+    """
+
+    def __init__(self, response: HttpResponse):
+        super().__init__()
+        self.response = response
+
+
+def get_dispatch_target(request: HttpRequest) -> Optional[str]:
+    return getattr(request, "__dfv_dispatch_target", None)
+
+
+def _start_target_dispatch(request: HttpRequest) -> bool:
+    htmx = get_htmx(request)
+    target = htmx.target if htmx else None
+    setattr(request, "__dfv_dispatch_target", target)
+    return target is not None
+
+
+def _render_until_target(fn: Callable, args, kwargs) -> Any:
+    try:
+        result = fn(*args, **kwargs)
+        if isinstance(result, SimpleTemplateResponse):
+            # lazy fragments in the template may contain the target element
+            result.render()
+        return result
+    except TargetElementRendered as e:
+        return e.response
+
+
+async def _arender_until_target(fn: Callable, args, kwargs) -> Any:
+    try:
+        result = fn(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        if isinstance(result, SimpleTemplateResponse):
+            await sync_to_async(cast(Any, result).render)()
+        return result
+    except TargetElementRendered as e:
+        return e.response
+
+
+def _vary_on_target(response: Any) -> Any:
+    if isinstance(response, HttpResponse):
+        patch_vary_headers(response, ("HX-Request", "HX-Target"))
+    return response
+
+
+def _handled(stream_state: Optional[StreamState]) -> Optional[int]:
+    # out-of-order elements may register response handlers while the view's
+    # handlers are processed, these belong to the end of the stream
+    return None if stream_state is None else stream_state.handled
+
+
+def _to_view_response(result: Any) -> Any:
+    # streaming responses and other results are passed through unchanged
+    if isinstance(result, ViewResponse) or not isinstance(result, HttpResponse):
+        return result
+    return ViewResponse(result)
+
+
 def view(
     *,
     decorators: Optional[list[Callable]] = None,
     login_required=False,
     handle_args=True,
+    cache: Optional[CachePolicy] = None,
+    etag=False,
+    freshness: Optional[FRESHNESS] = None,
+    target_dispatch=False,
+    stream=False,
 ) -> Callable[[VIEW_FN], VIEW_FN]:
+    """
+    With `target_dispatch=True`, an htmx request to the view only renders the
+    element whose id matches the HX-Target header. The element interrupts the
+    rendering of the view when it is rendered, so later siblings and the
+    view's template are skipped. Response handlers, e.g. for swap-oob
+    fragments, are processed as usual. The response varies on HX-Request and
+    HX-Target, so with `cache` a cached page is not returned for an htmx
+    request that targets one of its elements.
+
+    With `stream=True`, the view's response is streamed. Fragments created
+    with lazy() that the view outputs, usually in its template, are replaced
+    with placeholders. The content before the first fragment is sent right
+    away, and every fragment is rendered and sent when the stream reaches it.
+    The status and headers are fixed before the first chunk. Response handlers
+    registered by the fragments only contribute swap-oob fragments, which are
+    appended at the end of the stream. See to_streaming_response().
+    """
+    if stream and cache is not None:
+        raise Exception("A streaming view can not be cached.")
+
     if decorators is None:
         decorators = []
 
@@ -42,6 +269,14 @@ def view(
         decorators = [auth_decorators.login_required(), *decorators]
 
     def decorator(fn: VIEW_FN) -> VIEW_FN:
+        is_async = inspect.iscoroutinefunction(fn)
+
+        if cache is not None:
+            fn = cast(VIEW_FN, cache_view_fn(fn, cache))
+
+        if freshness is not None:
+            fn = cast(VIEW_FN, freshness_view_fn(fn, freshness))
+
         if handle_args:
             fn = inject_args()(fn)
 
@@ -55,18 +290,82 @@ def view(
             stack = get_view_fn_call_stack_from_request(view_request)
             try:
                 stack.append(fn)
-                result = fn(*args, **kwargs)
-                if result is not None and len(stack) == 1:
-                    result = process_response(view_request, result)
-
-                return (
-                    ViewResponse(result)
-                    if not isinstance(result, ViewResponse)
-                    else result
-                )
+                is_root = len(stack) == 1
+                stream_state: Optional[StreamState] = None
+                if target_dispatch and is_root and _start_target_dispatch(view_request):
+                    result = _render_until_target(fn, args, kwargs)
+                elif stream and is_root:
+                    result, stream_state = render_deferring_fragments(
+                        view_request, fn, args, kwargs
+                    )
+                else:
+                    result = fn(*args, **kwargs)
+                if isinstance(result, SimpleTemplateResponse) and is_root:
+                    # fragments in the template register response handlers
+                    result.render()
+                if result is not None and is_root:
+                    result = process_response(
+                        view_request, result, stop=_handled(stream_state)
+                    )
+
+                response = _to_view_response(result)
+                if target_dispatch and is_root:
+                    response = _vary_on_target(response)
+                if cache:
+                    response = store_cached_response(response)
+                if stream_state is not None:
+                    response = to_streaming_response(
+                        view_request, response, stream_state
+                    )
+                if etag and is_root:
+                    response = apply_etag(view_request, response)
+                return response
             finally:
                 stack.pop()
 
-        return cast(VIEW_FN, inner)
+        @functools.wraps(fn)
+        async def async_inner(*args, **kwargs) -> HttpResponse:
+            view_request: HttpRequest = args[0]
+            # every async view works on its own copy of the call stack, so that
+            # concurrently awaited views do not see each other
+            with fork_view_fn_call_stack(view_request) as stack:
+                stack.append(fn)
+                is_root = len(stack) == 1
+                stream_state: Optional[StreamState] = None
+                if target_dispatch and is_root and _start_target_dispatch(view_request):
+                    result = await _arender_until_target(fn, args, kwargs)
+                elif stream and is_root:
+                    result, stream_state = await arender_deferring_fragments(
+                        view_request, fn, args, kwargs
+                    )
+                else:
+                    result = fn(*args, **kwargs)
+                    if inspect.isawaitable(result):
+                        # decorators like login_required may return a response
+                        # instead of the coroutine
+                        result = await result
+                if isinstance(result, SimpleTemplateResponse):
+                    # templates may access the database, and fragments in the
+                    # template register response handlers
+                    await sync_to_async(cast(Any, result).render)()
+                if result is not None and is_root:
+                    result = await aprocess_response(
+                        view_request, result, stop=_handled(stream_state)
+                    )
+
+                response = _to_view_response(result)
+                if target_dispatch and is_root:
+                    response = _vary_on_target(response)
+                if cache:
+                    response = await astore_cached_response(response)
+                if stream_state is not None:
+                    response = to_streaming_response(
+                        view_request, response, stream_state
+                    )
+                if etag and is_root:
+                    response = apply_etag(view_request, response)
+                return response
+
+        return cast(VIEW_FN, async_inner if is_async else inner)
 
     return decorator
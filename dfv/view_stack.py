@@ -1,8 +1,16 @@
+import contextlib
 import typing
-from typing import Callable
+from contextvars import ContextVar
+from typing import Callable, Iterator
 
 from django.http import HttpRequest
 
+# A view fn call stack that is private to the current context (thread or asyncio
+# task). It takes precedence over the call stack stored on the request.
+_forked_view_fn_call_stack: ContextVar[
+    typing.Optional[tuple[HttpRequest, list[Callable]]]
+] = ContextVar("dfv_forked_view_fn_call_stack", default=None)
+
 
 @typing.overload
 def get_view_fn_call_stack_from_request(request: HttpRequest) -> list[Callable]:
@@ -19,12 +27,36 @@ def get_view_fn_call_stack_from_request(
 def get_view_fn_call_stack_from_request(
     request: HttpRequest, create=True
 ) -> typing.Optional[list[Callable]]:
+    forked = _forked_view_fn_call_stack.get()
+    if forked is not None and forked[0] is request:
+        return forked[1]
+
     call_stack = getattr(request, "__dfv_view_fn_call_stack", None)
     call_stack = [] if call_stack is None and create else call_stack
     setattr(request, "__dfv_view_fn_call_stack", call_stack)
     return call_stack
 
 
+@contextlib.contextmanager
+def fork_view_fn_call_stack(
+    request: HttpRequest, stack: typing.Optional[list[Callable]] = None
+) -> Iterator[list[Callable]]:
+    """
+    Runs the enclosed block with a copy of the request's current view fn call
+    stack, or of the given stack. Changes to the copy are only visible in the
+    current thread or asyncio task, so views running concurrently for the same
+    request do not interfere with each other's call stack.
+    """
+    stack = list(
+        stack if stack is not None else get_view_fn_call_stack_from_request(request)
+    )
+    token = _forked_view_fn_call_stack.set((request, stack))
+    try:
+        yield stack
+    finally:
+        _forked_view_fn_call_stack.reset(token)
+
+
 def get_view_fn_call_stack_from_request_or_raise(
     request: HttpRequest,
 ) -> list[Callable]:
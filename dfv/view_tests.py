@@ -1,10 +1,18 @@
+import asyncio
+import inspect
+import pickle
+
 import pytest
-from django.http import HttpResponse
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.response import TemplateResponse
 from django.test import RequestFactory
 from django.urls import path, resolve
 
 import dfv
+from dfv.htmx import swap_oob
 from dfv.testutils import create_resolved_request
+from dfv.view import ViewResponse
 from dfv.view_stack import (
     get_view_fn_call_stack_from_request,
     is_view_fn_request_target,
@@ -20,6 +28,61 @@ def test_str(rf: RequestFactory):
     assert response == "response"
 
 
+def test_view_response_keeps_response_class(rf: RequestFactory):
+    @dfv.view()
+    def json_view(_request):
+        return JsonResponse({"a": 1}, headers={"X-Foo": "foo"})
+
+    @dfv.view()
+    def template_view(request):
+        return TemplateResponse(request, "dfv/tests/TemplateResponse.html", {"foo": 1})
+
+    json_response = json_view(rf.get("/"))
+    assert isinstance(json_response, ViewResponse)
+    assert isinstance(json_response, JsonResponse)
+    assert json_response["X-Foo"] == "foo"
+    assert json_response.content == b'{"a": 1}'
+
+    template_response = template_view(rf.get("/"))
+    assert isinstance(template_response, TemplateResponse)
+    assert template_response.is_rendered
+    assert type(template_response) is not type(json_response)
+
+
+def test_view_response_passes_through_streaming_response(rf: RequestFactory):
+    streaming = StreamingHttpResponse(iter([b"a", b"b"]))
+
+    @dfv.view()
+    def view1(_request):
+        return streaming
+
+    assert view1(rf.get("/")) is streaming
+
+
+def test_view_response_swap_oob_after_content_access(rf: RequestFactory):
+    @dfv.view()
+    def view1(_request):
+        return HttpResponse("<div id='a'>a</div>")
+
+    response = view1(rf.get("/"))
+    assert response.content == b"<div id='a'>a</div>"
+    swap_oob(response, HttpResponse("<div id='b'>b</div>"))
+    assert response.content == (
+        b'<div id=\'a\'>a</div><div id="b" hx-swap-oob="outerHTML:#b">b</div>'
+    )
+
+
+def test_view_response_pickle(rf: RequestFactory):
+    @dfv.view()
+    def view1(request):
+        return TemplateResponse(request, "dfv/tests/TemplateResponse.html", {"foo": 1})
+
+    response = view1(rf.get("/"))
+    unpickled = pickle.loads(pickle.dumps(response))
+    assert type(unpickled) is TemplateResponse
+    assert unpickled.content == response.content
+
+
 def test_call_stack(rf: RequestFactory):
     @dfv.view()
     def view1(request):
@@ -102,3 +165,37 @@ def test_is_view_fn_target_raw_view(rf: RequestFactory):
         Exception, match="This function can only be called from within a DFV view."
     ):
         fn()
+
+
+def test_async_view(rf: RequestFactory):
+    @dfv.view()
+    async def view1(request, p1: str = dfv.param()):
+        stack = get_view_fn_call_stack_from_request(request)
+        assert len(stack) == 1
+        assert is_view_fn_request_target(request)
+        return HttpResponse(p1)
+
+    assert inspect.iscoroutinefunction(view1)
+    response = async_to_sync(view1)(rf.get("/?p1=a"))
+    assert str(response) == "a"
+
+
+def test_async_view_concurrent_nested_views_have_own_call_stack(
+    rf: RequestFactory,
+):
+    @dfv.view()
+    async def view1(request):
+        responses = await asyncio.gather(view2(request, "a"), view2(request, "b"))
+        assert len(get_view_fn_call_stack_from_request(request)) == 1
+        return HttpResponse("".join(str(r) for r in responses))
+
+    @dfv.view()
+    async def view2(request, name: str):
+        stack = get_view_fn_call_stack_from_request(request)
+        await asyncio.sleep(0)
+        assert len(stack) == 2
+        assert not is_view_fn_request_target(request)
+        return HttpResponse(name)
+
+    response = async_to_sync(view1)(rf.get("/"))
+    assert str(response) == "ab"
@@ -1,3 +1,4 @@
+import functools
 from datetime import datetime
 
 from django.http import HttpRequest
@@ -5,32 +6,50 @@ from django.shortcuts import render
 
 from dfv import element, param, view
 from dfv.element import body_response
+from dfv.fragment import lazy
+from dfv.gather import render_concurrently
 from dfv.htmx import swap_oob
 from dfv.route import create_path
+from dfv.template_block import render_page
 
 
-@view()
-def level1_page(request: HttpRequest):
-    return render(
+def _render_level1_page(request: HttpRequest):
+    return render_page(
         request,
         "elements/Level1Page.html",
         {
             "timestamp": datetime.now().microsecond,
-            "level2_element": level2_element(request, source="level1_page"),
+            "level2_element": lazy(level2_element, request, source="level1_page"),
         },
     )
 
 
+@view()
+def level1_page(request: HttpRequest):
+    return _render_level1_page(request)
+
+
+# the debug toolbar and django-browser-reload skip streaming responses
+@view(stream=True)
+def level1_stream_page(request: HttpRequest):
+    return _render_level1_page(request)
+
+
 @element()
 def level2_element(request: HttpRequest, source="level2"):
+    level3a, level3b = render_concurrently(
+        request,
+        functools.partial(level3a_element, request, source=source),
+        functools.partial(level3b_element, request, source=source),
+    )
     return render(
         request,
         "elements/Level2Element.html",
         {
             "timestamp": datetime.now().microsecond,
             "source": source,
-            "level3a_element": level3a_element(request, source=source),
-            "level3b_element": level3b_element(request, source=source),
+            "level3a_element": level3a,
+            "level3b_element": level3b,
         },
     )
 
@@ -76,5 +95,6 @@ def level3b_element(request: HttpRequest, source=""):
 
 urlpatterns = [
     create_path(level1_page, ""),
+    create_path(level1_stream_page, "stream"),
     create_path(level3a_element),
 ]
@@ -5,6 +5,7 @@ from django.urls import path, reverse
 
 from dfv import element
 from dfv.form import create_form, is_valid_submit
+from dfv.template_block import render_page
 
 
 class FormPageForm(forms.Form):
@@ -23,7 +24,7 @@ class FormPageForm(forms.Form):
 
 
 def form_page(request):
-    return render(
+    return render_page(
         request,
         "form/FormPage.html",
         {
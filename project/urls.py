@@ -1,12 +1,15 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from dfv.batch import create_batch_path
+
 # global URLs
 urlpatterns = [
     # DFV Demos
     path("elements/", include("main.views.elements")),
     path("form/", include("main.views.form")),
     path("demos/", include("main.views.demos")),
+    create_batch_path(),
     # Internal
     path("__adm__/", admin.site.urls),
     path("__debug__/", include("debug_toolbar.urls")),